@@ -4,17 +4,22 @@ from pathlib import Path
 
 import streamlit as st
 
-from src.a_star import a_estrella
 from src.grid import (
     Arista,
     ConfigMapa,
     dentro_del_mapa,
-    generar_obstaculos,
+    generar_obstaculos_conexos,
     normalizar_arista,
 )
+from src.a_star import EstadisticasBusqueda
+from src.alternativas import rutas_alternativas
+from src.cache_rutas import CacheRutas, clave_consulta, huella_mapa
 from src.exportar import exportar_resultados_csv
+from src.frente_onda import campo_obstaculos, riesgo_de_camino, riesgo_intersecciones
+from src.grafo import GrafoCompilado, compilar_grafo
+from src.pareto import frente_pareto
 from src.tiempos import generar_tiempos_calles
-from src.vp_tree import ArbolProximidadVP, distancia_manhattan
+from src.vp_tree import BosqueProximidadVP, distancia_manhattan
 from src.yen_ksp import Ruta, yen_k_mejores_rutas
 
 
@@ -237,7 +242,9 @@ def main() -> None:
     if "obstaculos" not in st.session_state:
         st.session_state.obstaculos = set()
     if "vp" not in st.session_state:
-        st.session_state.vp = ArbolProximidadVP([], distancia=distancia_manhattan)
+        st.session_state.vp = BosqueProximidadVP(distancia=distancia_manhattan)
+    if "riesgo" not in st.session_state:
+        st.session_state.riesgo = None
     if "rutas" not in st.session_state:
         st.session_state.rutas = []
     if "ruta_seleccionada" not in st.session_state:
@@ -246,6 +253,13 @@ def main() -> None:
         st.session_state.ruta_idx = 0
     if "tiempos_calles" not in st.session_state:
         st.session_state.tiempos_calles = {}
+    if "grafo_eta" not in st.session_state:
+        st.session_state.grafo_eta = None
+    if "cache_rutas" not in st.session_state:
+        # Memoria por sesión + sqlite compartido entre sesiones y reinicios
+        st.session_state.cache_rutas = CacheRutas(ruta_disco=Path(__file__).parent / "cache_rutas.sqlite")
+    if "huella_mapa" not in st.session_state:
+        st.session_state.huella_mapa = None
 
     # --- Controles (arriba) ---
     c_mapa, c_vehiculo = st.columns([1.1, 1.3])
@@ -272,46 +286,53 @@ def main() -> None:
                 tiempo_max=int(tiempo_max),
             )
 
-            def arista_bloqueada_desde(obs: set[Arista]):
-                def f(u: tuple[int, int], v: tuple[int, int]) -> bool:
-                    return normalizar_arista(u, v) in obs
-
-                return f
-
-            def hay_solucion(obs: set[Arista]) -> bool:
-                conf = st.session_state.conf
-                inicio = st.session_state.inicio
-                fin = st.session_state.fin
-                res = a_estrella(
-                    conf.filas,
-                    conf.columnas,
-                    inicio,
-                    fin,
-                    es_bloqueado=lambda _p: False,
-                    costo_paso=lambda _u, _v: 1.0,
-                    arista_bloqueada=arista_bloqueada_desde(obs),
-                )
-                return res is not None
+            conf = st.session_state.conf
+            if not (dentro_del_mapa(conf, st.session_state.inicio) and dentro_del_mapa(conf, st.session_state.fin)):
+                # El mapa se achicó: inicio/fin vuelven a las esquinas
+                st.session_state.inicio = (0, 0)
+                st.session_state.fin = (conf.filas - 1, conf.columnas - 1)
 
-            obs = generar_obstaculos(
+            # Una sola pasada con union-find: inicio y fin quedan conectados, densidad exacta
+            obs = generar_obstaculos_conexos(
                 conf=st.session_state.conf,
                 densidad_obstaculos=float(densidad),
                 semilla=int(semilla),
                 inicio=st.session_state.inicio,
                 fin=st.session_state.fin,
-                hay_solucion=hay_solucion,
             )
             st.session_state.obstaculos = obs
 
             # Indexar obstáculos en calles como puntos (midpoints) en una rejilla expandida (2x)
-            puntos: list[tuple[int, int]] = []
+            puntos: set[tuple[int, int]] = set()
             for u, v in obs:
                 (f1, c1), (f2, c2) = u, v
                 x1, y1 = 2 * f1, 2 * c1
                 x2, y2 = 2 * f2, 2 * c2
-                puntos.append(((x1 + x2) // 2, (y1 + y2) // 2))
+                puntos.add(((x1 + x2) // 2, (y1 + y2) // 2))
+
+            # Índice dinámico: sólo se aplican las calles que se abrieron o cerraron
+            vp_obs: BosqueProximidadVP[tuple[int, int]] = st.session_state.vp
+            for p in [p for p in vp_obs if p not in puntos]:
+                vp_obs.eliminar(p)
+            for p in puntos:
+                vp_obs.insertar(p)
+            # Mismas distancias, precalculadas para todas las intersecciones (consulta O(1))
+            st.session_state.riesgo = riesgo_intersecciones(campo_obstaculos(st.session_state.conf, obs))
+
+            # Preprocesar una vez por mapa: grafo ETA
+            st.session_state.grafo_eta = compilar_grafo(
+                conf=st.session_state.conf,
+                obstaculos=obs,
+                tiempos_calles=st.session_state.tiempos_calles,
+            )
 
-            st.session_state.vp = ArbolProximidadVP(puntos, distancia=distancia_manhattan)
+            # Mapa nuevo: liberar de memoria las rutas del anterior. El sqlite es compartido
+            # entre sesiones (otra puede seguir usando ese mapa) y la huella en la clave ya
+            # evita servir rutas viejas
+            huella = huella_mapa(st.session_state.conf, obs, st.session_state.tiempos_calles)
+            if st.session_state.huella_mapa not in (None, huella):
+                st.session_state.cache_rutas.invalidar_mapa(st.session_state.huella_mapa, disco=False)
+            st.session_state.huella_mapa = huella
             st.session_state.rutas = []
             st.session_state.ruta_seleccionada = 1
 
@@ -335,6 +356,16 @@ def main() -> None:
             index=0,
         )
 
+        modo = st.radio(
+            "Tipo de rutas",
+            options=["Top‑K (Yen)", "Alternativas distintas", "Frente de Pareto"],
+            index=0,
+            help=(
+                "Alternativas distintas: hasta K rutas que comparten como máximo la mitad de su costo. "
+                "Frente de Pareto: hasta K rutas no dominadas en distancia, tiempo y riesgo."
+            ),
+        )
+
         if st.button("Calcular rutas", type="primary"):
             st.session_state.conf = ConfigMapa(filas=int(filas), columnas=int(columnas))
             conf = st.session_state.conf
@@ -366,6 +397,7 @@ def main() -> None:
                     tiempo_max=5,
                 )
                 st.session_state.tiempos_calles = tiempos_calles
+                st.session_state.huella_mapa = None
 
             def arista_bloqueada(u: tuple[int, int], v: tuple[int, int]) -> bool:
                 return normalizar_arista(u, v) in obstaculos
@@ -373,12 +405,19 @@ def main() -> None:
             st.session_state.inicio = inicio
             st.session_state.fin = fin
 
-            vp: ArbolProximidadVP[tuple[int, int]] = st.session_state.vp
+            vp: BosqueProximidadVP[tuple[int, int]] = st.session_state.vp
 
             def a_expandido(p: tuple[int, int]) -> tuple[int, int]:
                 return (2 * p[0], 2 * p[1])
 
+            riesgo = st.session_state.riesgo
+            if riesgo is not None and riesgo.shape != (conf.filas, conf.columnas):
+                # El campo es de otro mapa: volver a las consultas al VP-Tree
+                riesgo = None
+
             def dist_a_obstaculo(p: tuple[int, int]) -> int:
+                if riesgo is not None:
+                    return int(riesgo[p])
                 _q, d = vp.mas_cercano(a_expandido(p))
                 return int(d)
 
@@ -394,20 +433,79 @@ def main() -> None:
             def riesgo_ruta(camino: list[tuple[int, int]]) -> int:
                 if not obstaculos:
                     return conf.filas + conf.columnas
-                return min(dist_a_obstaculo(p) for p in camino)
-
-            rutas = yen_k_mejores_rutas(
-                filas=conf.filas,
-                columnas=conf.columnas,
-                inicio=inicio,
-                fin=fin,
-                es_bloqueado=lambda _p: False,
-                arista_bloqueada_base=arista_bloqueada,
-                tiempo_paso=tiempo_paso,
-                costo_paso=costo_paso,
-                riesgo_ruta=riesgo_ruta,
-                k=int(k),
-            )
+                if riesgo is not None:
+                    return riesgo_de_camino(riesgo, camino)
+                return min(d for _q, d in vp.mas_cercano_lote([a_expandido(p) for p in camino]))
+
+            cache: CacheRutas = st.session_state.cache_rutas
+            if st.session_state.huella_mapa is None:
+                # Mapa sin pasar por "Generar obstáculos": la huella se calcula una sola vez
+                st.session_state.huella_mapa = huella_mapa(conf, obstaculos, tiempos_calles)
+            clave = clave_consulta(st.session_state.huella_mapa, inicio, fin, int(k), f"{criterio}|{modo}")
+            estadisticas = EstadisticasBusqueda()
+            rutas = cache.obtener(clave)
+            desde_cache = rutas is not None
+            if rutas is None:
+                # Compilar el mapa una vez: las búsquedas de Yen corren sobre buffers planos
+                if criterio == "Minimizar distancia (pasos)":
+                    grafo = compilar_grafo(
+                        conf=conf,
+                        obstaculos=obstaculos,
+                        tiempos_calles=tiempos_calles,
+                        uniforme=True,
+                    )
+                else:
+                    grafo_eta: GrafoCompilado | None = st.session_state.grafo_eta
+                    if grafo_eta is None or (grafo_eta.filas, grafo_eta.columnas) != (conf.filas, conf.columnas):
+                        grafo_eta = compilar_grafo(conf=conf, obstaculos=obstaculos, tiempos_calles=tiempos_calles)
+                        st.session_state.grafo_eta = grafo_eta
+                    grafo = grafo_eta
+
+                if modo == "Frente de Pareto":
+                    rutas = frente_pareto(
+                        filas=conf.filas,
+                        columnas=conf.columnas,
+                        inicio=inicio,
+                        fin=fin,
+                        es_bloqueado=lambda _p: False,
+                        arista_bloqueada_base=arista_bloqueada,
+                        tiempo_paso=tiempo_paso,
+                        costo_paso=costo_paso,
+                        riesgo_punto=(lambda _p: conf.filas + conf.columnas) if not obstaculos else dist_a_obstaculo,
+                        max_frente=int(k),
+                    )
+                elif modo == "Alternativas distintas":
+                    rutas = rutas_alternativas(
+                        filas=conf.filas,
+                        columnas=conf.columnas,
+                        inicio=inicio,
+                        fin=fin,
+                        es_bloqueado=lambda _p: False,
+                        arista_bloqueada_base=arista_bloqueada,
+                        tiempo_paso=tiempo_paso,
+                        costo_paso=costo_paso,
+                        riesgo_ruta=riesgo_ruta,
+                        n=int(k),
+                        grafo=grafo,
+                    )
+                else:
+                    rutas = yen_k_mejores_rutas(
+                        filas=conf.filas,
+                        columnas=conf.columnas,
+                        inicio=inicio,
+                        fin=fin,
+                        es_bloqueado=lambda _p: False,
+                        arista_bloqueada_base=arista_bloqueada,
+                        tiempo_paso=tiempo_paso,
+                        costo_paso=costo_paso,
+                        riesgo_ruta=riesgo_ruta,
+                        k=int(k),
+                        grafo=grafo,
+                        estadisticas=estadisticas,
+                        # Heurística exacta (Dijkstra inverso): rinde más que ALT en las spur
+                        arbol_inverso=True,
+                    )
+                cache.guardar(clave, rutas)
 
             st.session_state.rutas = rutas
             st.session_state.ruta_seleccionada = 1
@@ -420,6 +518,14 @@ def main() -> None:
                 ruta_csv = Path(__file__).parent / "results.csv"
                 exportar_resultados_csv(rutas, ruta_csv)
                 st.success(f"Se calcularon {len(rutas)} rutas. Exportado: {ruta_csv.name}")
+                if desde_cache:
+                    st.caption(f"Rutas desde caché ({cache.aciertos} aciertos, {cache.fallos} fallos).")
+                elif modo == "Top‑K (Yen)":
+                    st.caption(
+                        f"Búsqueda: {estadisticas.expandidos} nodos expandidos, "
+                        f"{estadisticas.busquedas_spur} spur ({estadisticas.spur_fallidas} sin ruta), "
+                        f"máx. abiertos {estadisticas.max_abiertos}."
+                    )
 
     st.divider()
 
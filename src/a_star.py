@@ -2,10 +2,14 @@ from __future__ import annotations
 
 import heapq
 from dataclasses import dataclass
-from typing import Callable, Iterable, Optional
+from typing import Callable, Iterable, Mapping, Optional
+
+from .colas import ColaDial, MonticuloRadix, elegir_cola
 
 Coord = tuple[int, int]
 
+_INF = float("inf")
+
 
 def vecinos_4(filas: int, columnas: int, nodo: Coord) -> Iterable[Coord]:
     f, c = nodo
@@ -29,6 +33,61 @@ class ResultadoAEstrella:
     costo_total: float
 
 
+@dataclass
+class EstadisticasBusqueda:
+    """Contadores acumulados de una o varias búsquedas (opcional: pasar `estadisticas=`).
+
+    - `expandidos`: nodos sacados del heap y expandidos.
+    - `inserciones`: pushes al heap; `descartes`: pops de entradas obsoletas.
+    - `max_abiertos`: tamaño máximo del heap en cualquiera de las búsquedas.
+    - `busquedas_spur` / `spur_fallidas`: búsquedas spur de Yen y cuántas no hallaron ruta.
+    """
+
+    busquedas: int = 0
+    busquedas_fallidas: int = 0
+    expandidos: int = 0
+    inserciones: int = 0
+    descartes: int = 0
+    max_abiertos: int = 0
+    busquedas_spur: int = 0
+    spur_fallidas: int = 0
+
+    def sumar(self, otra: "EstadisticasBusqueda") -> None:
+        self.busquedas += otra.busquedas
+        self.busquedas_fallidas += otra.busquedas_fallidas
+        self.expandidos += otra.expandidos
+        self.inserciones += otra.inserciones
+        self.descartes += otra.descartes
+        self.max_abiertos = max(self.max_abiertos, otra.max_abiertos)
+        self.busquedas_spur += otra.busquedas_spur
+        self.spur_fallidas += otra.spur_fallidas
+
+    def anotar(
+        self,
+        *,
+        encontrado: bool,
+        expandidos: int = 0,
+        inserciones: int = 0,
+        pendientes: int = 0,
+        max_abiertos: int = 0,
+    ) -> None:
+        """Registra una búsqueda; `pendientes` son las entradas que quedaron en el heap."""
+        self.busquedas += 1
+        if not encontrado:
+            self.busquedas_fallidas += 1
+        self.expandidos += expandidos
+        self.inserciones += inserciones
+        self.descartes += max(0, inserciones - pendientes - expandidos)
+        self.max_abiertos = max(self.max_abiertos, max_abiertos)
+
+
+def _clave_entera(f: float) -> int:
+    clave = int(f)
+    if clave != f:
+        raise ValueError(f"La cola por cubetas requiere costos y heurística enteros (f={f})")
+    return clave
+
+
 def a_estrella(
     filas: int,
     columnas: int,
@@ -38,15 +97,56 @@ def a_estrella(
     costo_paso: Callable[[Coord, Coord], float],
     arista_bloqueada: Optional[Callable[[Coord, Coord], bool]] = None,
     nodo_bloqueado: Optional[Callable[[Coord], bool]] = None,
+    heuristica: Optional[Callable[[Coord, Coord], float]] = None,
+    estadisticas: Optional[EstadisticasBusqueda] = None,
+    tabla_heuristica: Optional[Mapping[Coord, float]] = None,
+    cota_costo: Optional[float] = None,
+    cola: str = "auto",
+    peso_maximo: Optional[int] = None,
 ) -> Optional[ResultadoAEstrella]:
     """A* con movimiento 4-direcciones.
 
     `costo_paso(u, v)` debe ser >= 1 para mantener heurística (Manhattan) admisible.
+    `heuristica(v, fin)` reemplaza a Manhattan (p. ej. `TablaLandmarks.heuristica`); debe ser admisible.
+    `estadisticas`, si se pasa, acumula los contadores de esta búsqueda.
+    `tabla_heuristica[v]` (p. ej. `distancias_hasta(...)` hacia este mismo `fin`) tiene
+    prioridad sobre `heuristica`; los nodos que no están en la tabla no llegan a `fin` y se
+    descartan. A igual `f` se expande primero el de mayor `g` (con la tabla exacta, la
+    búsqueda sigue el árbol inverso sin abrir caminos empatados).
+    `cota_costo`: sólo interesan rutas de costo <= cota; no se abren nodos con `f` mayor y,
+    si no queda ninguno, devuelve None sin agotar el mapa.
+    `peso_maximo`: si los costos son enteros `<= peso_maximo` (p. ej. tiempos de
+    `generar_tiempos_calles`, o 1 para distancia), `cola="auto"` usa una cola de Dial en vez
+    de `heapq` (ver `src/colas.py`); `cola` fuerza `"heap"`, `"dial"` o `"radix"`. Mismo
+    costo. Con cubetas la heurística debe ser consistente y dar `f` enteros (ValueError si no).
     """
 
+    cota = _INF if cota_costo is None else cota_costo
+    modo = elegir_cola(cola, peso_maximo)
+    cubetas: Optional[ColaDial[Coord] | MonticuloRadix[Coord]] = None
+    if modo == "dial":
+        cubetas = ColaDial(2 * int(peso_maximo))  # type: ignore[arg-type]
+    elif modo == "radix":
+        cubetas = MonticuloRadix()
+
+    if tabla_heuristica is not None:
+        tabla = tabla_heuristica
+
+        def h(v: Coord, _fin: Coord) -> float:
+            return tabla.get(v, _INF)
+
+        desempate = -1.0
+    else:
+        h = heuristica or heuristica_manhattan
+        desempate = 1.0
+
     if inicio == fin:
+        if estadisticas is not None:
+            estadisticas.anotar(encontrado=True)
         return ResultadoAEstrella(camino=[inicio], costo_total=0.0)
     if es_bloqueado(inicio) or es_bloqueado(fin):
+        if estadisticas is not None:
+            estadisticas.anotar(encontrado=False)
         return None
 
     def permitido(n: Coord) -> bool:
@@ -57,28 +157,54 @@ def a_estrella(
         return True
 
     if not permitido(inicio) or not permitido(fin):
+        if estadisticas is not None:
+            estadisticas.anotar(encontrado=False)
         return None
 
     abiertos: list[tuple[float, float, Coord]] = []
     g: dict[Coord, float] = {inicio: 0.0}
     padre: dict[Coord, Coord] = {}
 
-    f0 = heuristica_manhattan(inicio, fin)
-    heapq.heappush(abiertos, (f0, 0.0, inicio))
+    f0 = h(inicio, fin)
+    if f0 == _INF or f0 > cota:
+        if estadisticas is not None:
+            estadisticas.anotar(encontrado=False)
+        return None
+    if cubetas is not None:
+        cubetas.insertar(_clave_entera(f0), inicio)
+    else:
+        heapq.heappush(abiertos, (f0, 0.0, inicio))
+    inserciones = 1
+    max_abiertos = 1
 
     visitado: set[Coord] = set()
 
-    while abiertos:
-        _, g_actual, actual = heapq.heappop(abiertos)
+    def anotar(encontrado: bool) -> None:
+        if estadisticas is not None:
+            estadisticas.anotar(
+                encontrado=encontrado,
+                expandidos=len(visitado),
+                inserciones=inserciones,
+                pendientes=len(cubetas) if cubetas is not None else len(abiertos),
+                max_abiertos=max_abiertos,
+            )
+
+    while cubetas if cubetas is not None else abiertos:
+        if cubetas is not None:
+            _, actual = cubetas.extraer()
+        else:
+            _, _, actual = heapq.heappop(abiertos)
         if actual in visitado:
             continue
         visitado.add(actual)
+        g_actual = g[actual]
 
         if actual == fin:
             camino: list[Coord] = [fin]
             while camino[-1] != inicio:
                 camino.append(padre[camino[-1]])
             camino.reverse()
+            anotar(True)
             return ResultadoAEstrella(camino=camino, costo_total=g[fin])
 
         for v in vecinos_4(filas, columnas, actual):
@@ -89,9 +215,180 @@ def a_estrella(
 
             tentativo = g_actual + float(costo_paso(actual, v))
             if tentativo < g.get(v, 10**18):
+                f = tentativo + h(v, fin)
+                if f == _INF or f > cota:
+                    continue
                 g[v] = tentativo
                 padre[v] = actual
-                f = tentativo + heuristica_manhattan(v, fin)
-                heapq.heappush(abiertos, (f, tentativo, v))
+                if cubetas is not None:
+                    cubetas.insertar(_clave_entera(f), v)
+                else:
+                    heapq.heappush(abiertos, (f, desempate * tentativo, v))
+                if estadisticas is not None:
+                    inserciones += 1
+                    max_abiertos = max(
+                        max_abiertos, len(cubetas) if cubetas is not None else len(abiertos)
+                    )
 
+    anotar(False)
     return None
+
+
+def a_estrella_bidireccional(
+    filas: int,
+    columnas: int,
+    inicio: Coord,
+    fin: Coord,
+    es_bloqueado: Callable[[Coord], bool],
+    costo_paso: Callable[[Coord, Coord], float],
+    arista_bloqueada: Optional[Callable[[Coord, Coord], bool]] = None,
+    nodo_bloqueado: Optional[Callable[[Coord], bool]] = None,
+    heuristica: Optional[Callable[[Coord, Coord], float]] = None,
+    estadisticas: Optional[EstadisticasBusqueda] = None,
+) -> Optional[ResultadoAEstrella]:
+    """A* bidireccional (adelante desde `inicio`, atrás desde `fin`).
+
+    Usa el potencial promedio `p(v) = (h_fin(v) - h_inicio(v)) / 2` (Manhattan), que es
+    consistente en ambos sentidos, y se detiene cuando `tope_adelante + tope_atras >= mejor`,
+    así el costo devuelto es óptimo. Con `costo_paso(u, v) >= 1`, igual que `a_estrella`.
+
+    La búsqueda hacia atrás evalúa `arista_bloqueada(u, v)` y `costo_paso(u, v)` en el sentido
+    original del recorrido, por lo que respeta bloqueos dirigidos (como los de Yen).
+    `heuristica` (simétrica y consistente, p. ej. ALT) reemplaza a Manhattan en el potencial.
+    """
+
+    h = heuristica or heuristica_manhattan
+
+    if inicio == fin:
+        if estadisticas is not None:
+            estadisticas.anotar(encontrado=True)
+        return ResultadoAEstrella(camino=[inicio], costo_total=0.0)
+    if es_bloqueado(inicio) or es_bloqueado(fin):
+        if estadisticas is not None:
+            estadisticas.anotar(encontrado=False)
+        return None
+
+    def permitido(n: Coord) -> bool:
+        if es_bloqueado(n):
+            return False
+        if nodo_bloqueado and nodo_bloqueado(n):
+            return False
+        return True
+
+    if not permitido(inicio) or not permitido(fin):
+        if estadisticas is not None:
+            estadisticas.anotar(encontrado=False)
+        return None
+
+    def potencial(n: Coord) -> float:
+        return 0.5 * (h(n, fin) - h(n, inicio))
+
+    # Índice 0 = adelante, 1 = atrás
+    g: tuple[dict[Coord, float], dict[Coord, float]] = ({inicio: 0.0}, {fin: 0.0})
+    padre: tuple[dict[Coord, Coord], dict[Coord, Coord]] = ({}, {})
+    cerrado: tuple[set[Coord], set[Coord]] = (set(), set())
+    abiertos: tuple[list[tuple[float, float, Coord]], list[tuple[float, float, Coord]]] = (
+        [(potencial(inicio), 0.0, inicio)],
+        [(-potencial(fin), 0.0, fin)],
+    )
+
+    mejor = float("inf")
+    encuentro: Optional[tuple[Coord, Coord]] = None  # arista (u, v) en sentido inicio -> fin
+    inserciones = 2
+    max_abiertos = 2
+
+    def tope(lado: int) -> float:
+        heap = abiertos[lado]
+        while heap and heap[0][2] in cerrado[lado]:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else float("inf")
+
+    while True:
+        tope_ad = tope(0)
+        tope_at = tope(1)
+        if tope_ad + tope_at >= mejor or tope_ad == float("inf") or tope_at == float("inf"):
+            break
+
+        # Expandir el lado con menos abiertos
+        lado = 0 if len(abiertos[0]) <= len(abiertos[1]) else 1
+        otro = 1 - lado
+        _, g_actual, actual = heapq.heappop(abiertos[lado])
+        cerrado[lado].add(actual)
+
+        for v in vecinos_4(filas, columnas, actual):
+            if v in cerrado[lado] or not permitido(v):
+                continue
+            u_ad, v_ad = (actual, v) if lado == 0 else (v, actual)
+            if arista_bloqueada and arista_bloqueada(u_ad, v_ad):
+                continue
+
+            tentativo = g_actual + float(costo_paso(u_ad, v_ad))
+            if tentativo < g[lado].get(v, 10**18):
+                g[lado][v] = tentativo
+                padre[lado][v] = actual
+                clave = tentativo + (potencial(v) if lado == 0 else -potencial(v))
+                heapq.heappush(abiertos[lado], (clave, tentativo, v))
+                if estadisticas is not None:
+                    inserciones += 1
+                    max_abiertos = max(max_abiertos, len(abiertos[0]) + len(abiertos[1]))
+
+            g_otro = g[otro].get(v)
+            if g_otro is not None and tentativo + g_otro < mejor:
+                mejor = tentativo + g_otro
+                encuentro = (u_ad, v_ad)
+
+    if estadisticas is not None:
+        estadisticas.anotar(
+            encontrado=encuentro is not None,
+            expandidos=len(cerrado[0]) + len(cerrado[1]),
+            inserciones=inserciones,
+            pendientes=len(abiertos[0]) + len(abiertos[1]),
+            max_abiertos=max_abiertos,
+        )
+    if encuentro is None:
+        return None
+
+    a, b = encuentro
+    camino: list[Coord] = [a]
+    while camino[-1] != inicio:
+        camino.append(padre[0][camino[-1]])
+    camino.reverse()
+    camino.append(b)
+    while camino[-1] != fin:
+        camino.append(padre[1][camino[-1]])
+
+    return ResultadoAEstrella(camino=camino, costo_total=mejor)
+
+
+def distancias_hasta(
+    filas: int,
+    columnas: int,
+    fin: Coord,
+    es_bloqueado: Callable[[Coord], bool],
+    costo_paso: Callable[[Coord, Coord], float],
+    arista_bloqueada: Optional[Callable[[Coord, Coord], bool]] = None,
+) -> dict[Coord, float]:
+    """Dijkstra inverso: costo exacto de cada intersección hasta `fin` (las inalcanzables no aparecen).
+
+    Recorre las calles al revés (`costo_paso(v, u)` para llegar de `v` a `u`), así que sirve
+    también con costos asimétricos. Pensado como `tabla_heuristica` de `a_estrella`.
+    """
+
+    if es_bloqueado(fin):
+        return {}
+    dist: dict[Coord, float] = {fin: 0.0}
+    abiertos: list[tuple[float, Coord]] = [(0.0, fin)]
+    while abiertos:
+        du, u = heapq.heappop(abiertos)
+        if du > dist[u]:
+            continue
+        for v in vecinos_4(filas, columnas, u):
+            if es_bloqueado(v):
+                continue
+            if arista_bloqueada and arista_bloqueada(v, u):
+                continue
+            nd = du + float(costo_paso(v, u))
+            if nd < dist.get(v, _INF):
+                dist[v] = nd
+                heapq.heappush(abiertos, (nd, v))
+    return dist
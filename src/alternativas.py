@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import copy
+from array import array
+from typing import Callable, Optional
+
+from .a_star import Coord, ResultadoAEstrella, a_estrella
+from .grafo import GrafoCompilado, a_estrella_grafo
+from .grid import Arista, normalizar_arista
+from .yen_ksp import Ruta
+
+
+def _aristas_de(camino: list[Coord]) -> list[Arista]:
+    return [normalizar_arista(a, b) for a, b in zip(camino[:-1], camino[1:])]
+
+
+def rutas_alternativas(
+    *,
+    filas: int,
+    columnas: int,
+    inicio: Coord,
+    fin: Coord,
+    es_bloqueado: Callable[[Coord], bool],
+    arista_bloqueada_base: Optional[Callable[[Coord, Coord], bool]] = None,
+    tiempo_paso: Callable[[Coord, Coord], float],
+    costo_paso: Callable[[Coord, Coord], float],
+    riesgo_ruta: Callable[[list[Coord]], int],
+    n: int,
+    max_solape: float = 0.5,
+    factor_penalizacion: float = 1.4,
+    max_estiramiento: float = 1.6,
+    max_iteraciones: Optional[int] = None,
+    grafo: Optional[GrafoCompilado] = None,
+) -> list[Ruta]:
+    """Hasta `n` rutas alternativas *distintas entre sí* (método de penalización).
+
+    Yen devuelve rutas casi iguales (difieren en una cuadra). Aquí, tras cada búsqueda se
+    multiplica por `factor_penalizacion` (> 1) el costo de las calles usadas y se vuelve a buscar;
+    un candidato se acepta si:
+
+    - el costo de las calles que comparte con cada ruta aceptada no supera `max_solape`
+      veces el costo de la más corta de las dos (la restricción es simétrica), y
+    - su costo real no supera `max_estiramiento` veces el de la ruta más corta.
+
+    Hace pocas búsquedas (a lo sumo `max_iteraciones`, por defecto `4 * n`). Con `grafo`
+    penaliza una copia de sus costos y usa `a_estrella_grafo`; si no, `a_estrella` con los
+    callables. Devuelve `Ruta` ordenadas por `costo_total` (costos sin penalización).
+    """
+
+    if factor_penalizacion <= 1.0:
+        raise ValueError("factor_penalizacion debe ser > 1 (si no, las rutas no se separan)")
+    if n <= 0:
+        return []
+    iteraciones = max_iteraciones if max_iteraciones is not None else 4 * n
+    penalizacion: dict[Arista, float] = {}
+
+    grafo_penalizado: Optional[GrafoCompilado] = None
+    if grafo is not None:
+        # Copia superficial con su propio arreglo de costos (el original no se toca); sus
+        # costos se cambian con `fijar_costo`, que mantiene el rango y las banderas al día
+        grafo_penalizado = copy.copy(grafo)
+        grafo_penalizado.costo = array("d", grafo.costo)
+
+    def costo_penalizado(u: Coord, v: Coord) -> float:
+        return float(costo_paso(u, v)) * penalizacion.get(normalizar_arista(u, v), 1.0)
+
+    def buscar() -> Optional[ResultadoAEstrella]:
+        if grafo_penalizado is not None:
+            return a_estrella_grafo(grafo_penalizado, inicio, fin)
+        return a_estrella(
+            filas,
+            columnas,
+            inicio,
+            fin,
+            es_bloqueado=es_bloqueado,
+            costo_paso=costo_penalizado,
+            arista_bloqueada=arista_bloqueada_base,
+        )
+
+    def penalizar(aristas: list[Arista]) -> None:
+        for arista in aristas:
+            factor = penalizacion.get(arista, 1.0) * factor_penalizacion
+            penalizacion[arista] = factor
+            if grafo is not None and grafo_penalizado is not None:
+                grafo_penalizado.fijar_costo(arista[0], arista[1], grafo.costo_arista(*arista) * factor)
+
+    aceptadas: list[tuple[list[Coord], float, dict[Arista, float]]] = []
+    costo_minimo: Optional[float] = None
+    vistos: set[tuple[Coord, ...]] = set()
+
+    for _ in range(iteraciones):
+        if len(aceptadas) >= n:
+            break
+        r = buscar()
+        if r is None:
+            break
+        camino = r.camino
+        aristas = _aristas_de(camino)
+        penalizar(aristas)
+
+        t = tuple(camino)
+        if t in vistos:
+            continue
+        vistos.add(t)
+
+        costos = {arista: float(costo_paso(*arista)) for arista in aristas}
+        costo_real = sum(costos.values())
+        if costo_minimo is None:
+            costo_minimo = costo_real
+        elif costo_real > max_estiramiento * costo_minimo:
+            # Las penalizaciones ya empujan a desvíos demasiado largos
+            break
+
+        if any(
+            sum(c for arista, c in costos.items() if arista in otras)
+            > max_solape * min(costo_real, costo_otra)
+            for _c, costo_otra, otras in aceptadas
+        ):
+            continue
+        aceptadas.append((camino, costo_real, costos))
+
+    rutas: list[Ruta] = []
+    for camino, costo_real, _costos in sorted(aceptadas, key=lambda x: x[1]):
+        tiempo_total = sum(float(tiempo_paso(a, b)) for a, b in zip(camino[:-1], camino[1:]))
+        rutas.append(
+            Ruta(
+                ruta_id=len(rutas) + 1,
+                camino=camino,
+                distancia_total=max(0, len(camino) - 1),
+                tiempo_total=int(round(tiempo_total)),
+                riesgo=riesgo_ruta(camino),
+                costo_total=costo_real,
+            )
+        )
+    return rutas
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import heapq
+import time
+from array import array
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from .a_star import Coord, EstadisticasBusqueda, ResultadoAEstrella
+from .grafo import INF, GrafoCompilado, _aristas_dirigidas
+from .landmarks import TablaLandmarks
+
+# Cada cuántas expansiones se mira el reloj
+_REVISAR_RELOJ_CADA = 256
+
+
+@dataclass(frozen=True)
+class ResultadoAnytime(ResultadoAEstrella):
+    """Ruta de `a_estrella_anytime`: `costo_total <= epsilon * costo_optimo`."""
+
+    epsilon: float = 1.0
+    iteraciones: int = 0
+
+
+def a_estrella_anytime(
+    grafo: GrafoCompilado,
+    inicio: Coord,
+    fin: Coord,
+    *,
+    plazo: Optional[float] = None,
+    epsilon_inicial: Optional[float] = None,
+    factor_epsilon: float = 0.5,
+    epsilon_objetivo: float = 1.0,
+    nodos_bloqueados: Optional[Iterable[Coord]] = None,
+    aristas_bloqueadas: Optional[Iterable[tuple[Coord, Coord]]] = None,
+    landmarks: Optional[TablaLandmarks] = None,
+    estadisticas: Optional[EstadisticasBusqueda] = None,
+) -> Optional[ResultadoAnytime]:
+    """A* "anytime" (estilo ARA*) con plazo de latencia.
+
+    Empieza con A* ponderado (`f = g + epsilon * h`) y, reutilizando la búsqueda anterior,
+    acerca `epsilon` a 1 multiplicando su exceso por `factor_epsilon`, hasta llegar a
+    `epsilon_objetivo` o hasta `plazo` (instante absoluto de `time.perf_counter()`).
+
+    Por defecto `epsilon_inicial = max(3, costo_max / costo_min)`: con tiempos 1..60 Manhattan
+    subestima mucho, y un epsilon chico no daría una primera ruta rápida.
+
+    Devuelve la mejor ruta encontrada y la cota alcanzada en `epsilon`
+    (`costo_total <= epsilon * óptimo`), o None si no hay ruta o el plazo venció antes de
+    la primera solución. Si el plazo corta una pasada, la cota es
+    `g(fin) / min(g + h)` sobre OPEN ∪ INCONS (el epsilon de esa pasada todavía no vale)
+    o la de la última pasada completa, la menor.
+    """
+
+    if not (grafo.contiene(inicio) and grafo.contiene(fin)):
+        return None
+    if inicio == fin:
+        return ResultadoAnytime(camino=[inicio], costo_total=0.0, epsilon=1.0)
+    bloqueados = {grafo.id_de(p) for p in nodos_bloqueados} if nodos_bloqueados else set()
+    s = grafo.id_de(inicio)
+    t = grafo.id_de(fin)
+    if s in bloqueados or t in bloqueados:
+        return None
+    ab = _aristas_dirigidas(grafo, aristas_bloqueadas)
+
+    columnas = grafo.columnas
+    costo = grafo.costo
+    bloqueada = grafo.bloqueada
+    desp = grafo.desplazamiento
+    escala = grafo.costo_min
+    ft, ct = divmod(t, columnas)
+    alt = landmarks.cota if landmarks is not None and len(landmarks) else None
+
+    def h(v: int) -> float:
+        fv, cv = divmod(v, columnas)
+        valor = escala * (abs(fv - ft) + abs(cv - ct))
+        if alt is not None:
+            valor = max(valor, alt(v, t))
+        return valor
+
+    g = array("d", [INF]) * grafo.n
+    padre = array("l", [-1]) * grafo.n
+    g[s] = 0.0
+
+    if epsilon_inicial is None:
+        epsilon_inicial = max(3.0, grafo.costo_max / grafo.costo_min)
+    epsilon = max(1.0, float(epsilon_inicial))
+    objetivo = max(1.0, float(epsilon_objetivo))
+    abiertos: set[int] = {s}
+    heap: list[tuple[float, int]] = [(epsilon * h(s), s)]
+    cerrados: set[int] = set()
+    inconsistentes: set[int] = set()
+
+    mejor: Optional[ResultadoAnytime] = None
+    iteraciones = 0
+    expandidos = 0
+    inserciones = 1
+    max_abiertos = 1
+
+    def vencido() -> bool:
+        return plazo is not None and time.perf_counter() >= plazo
+
+    def camino_actual() -> tuple[list[Coord], float]:
+        # El costo se suma sobre el camino: tras una interrupción puede ser menor que g(fin)
+        ids = [t]
+        while ids[-1] != s:
+            ids.append(padre[ids[-1]])
+        ids.reverse()
+        total = 0.0
+        for a, b in zip(ids[:-1], ids[1:]):
+            total += costo[a * 4 + grafo.direccion(a, b)]
+        return grafo.camino_a_coords(ids), total
+
+    def cota_alcanzada(completo: bool) -> float:
+        # g(fin) / min_{v en OPEN ∪ INCONS} (g(v) + h(v)) vale en todo momento (todo cerrado se
+        # expandió con su g actual); `epsilon` sólo queda garantizado si ImprovePath terminó
+        pendientes = abiertos | inconsistentes
+        if not pendientes:
+            return 1.0
+        minimo = min(g[v] + h(v) for v in pendientes)
+        if minimo <= 0.0:
+            return epsilon if completo else INF
+        if completo:
+            return max(1.0, min(epsilon, g[t] / minimo))
+        return max(1.0, g[t] / minimo)
+
+    def anotar() -> None:
+        if estadisticas is not None:
+            estadisticas.anotar(
+                encontrado=mejor is not None,
+                expandidos=expandidos,
+                inserciones=inserciones,
+                pendientes=len(heap),
+                max_abiertos=max_abiertos,
+            )
+
+    while True:
+        iteraciones += 1
+        # --- ImprovePath con el epsilon actual ---
+        interrumpido = False
+        while heap and heap[0][0] < g[t]:
+            clave, u = heapq.heappop(heap)
+            if u not in abiertos or clave != g[u] + epsilon * h(u):
+                continue
+            if expandidos % _REVISAR_RELOJ_CADA == 0 and vencido():
+                # `u` vuelve a OPEN sin expandir: los cerrados siguen siendo consistentes
+                heapq.heappush(heap, (clave, u))
+                interrumpido = True
+                break
+            abiertos.discard(u)
+            cerrados.add(u)
+            expandidos += 1
+
+            gu = g[u]
+            base = u * 4
+            for d in range(4):
+                if bloqueada[base + d]:
+                    continue
+                v = u + desp[d]
+                if v in bloqueados or (ab is not None and (u, v) in ab):
+                    continue
+                tentativo = gu + costo[base + d]
+                if tentativo < g[v]:
+                    g[v] = tentativo
+                    padre[v] = u
+                    if v in cerrados:
+                        inconsistentes.add(v)
+                    else:
+                        abiertos.add(v)
+                        heapq.heappush(heap, (tentativo + epsilon * h(v), v))
+                        inserciones += 1
+                        if len(heap) > max_abiertos:
+                            max_abiertos = len(heap)
+
+        if g[t] < INF:
+            cota = 1.0 if not interrumpido and epsilon <= 1.0 else cota_alcanzada(not interrumpido)
+            if mejor is not None and g[t] < mejor.costo_total:
+                # Más barata que la anterior: la cota de la anterior también la acota
+                cota = min(cota, mejor.epsilon)
+            if mejor is None or g[t] < mejor.costo_total or cota < mejor.epsilon:
+                camino, total = camino_actual()
+                mejor = ResultadoAnytime(
+                    camino=camino,
+                    costo_total=total,
+                    epsilon=cota,
+                    iteraciones=iteraciones,
+                )
+        elif not interrumpido:
+            # Sin ruta posible (la búsqueda agotó OPEN)
+            anotar()
+            return None
+
+        if interrumpido or mejor is None or mejor.epsilon <= objetivo or vencido():
+            anotar()
+            return mejor
+
+        # --- Bajar epsilon y reabrir los inconsistentes ---
+        epsilon = 1.0 + (min(epsilon, mejor.epsilon) - 1.0) * factor_epsilon
+        if epsilon < 1.01:
+            epsilon = 1.0
+        epsilon = max(objetivo, epsilon)
+        abiertos |= inconsistentes
+        inconsistentes = set()
+        cerrados = set()
+        heap = [(g[v] + epsilon * h(v), v) for v in abiertos]
+        heapq.heapify(heap)
@@ -1,19 +1,20 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Generic, Iterable, Optional, TypeVar
+from typing import Generic, Iterable, Iterator, Optional, TypeVar
 
 K = TypeVar("K")
 V = TypeVar("V")
 
 
-@dataclass
 class _NodoAVL(Generic[K, V]):
-    clave: K
-    valores: list[V]
-    altura: int = 1
-    izq: Optional["_NodoAVL[K, V]"] = None
-    der: Optional["_NodoAVL[K, V]"] = None
+    __slots__ = ("clave", "valores", "altura", "izq", "der")
+
+    def __init__(self, clave: K, valores: list[V]) -> None:
+        self.clave = clave
+        self.valores = valores
+        self.altura = 1
+        self.izq: Optional[_NodoAVL[K, V]] = None
+        self.der: Optional[_NodoAVL[K, V]] = None
 
 
 def _altura(nodo: Optional[_NodoAVL[K, V]]) -> int:
@@ -56,15 +57,81 @@ def _rotar_izq(x: _NodoAVL[K, V]) -> _NodoAVL[K, V]:
     return y
 
 
+def _equilibrar(nodo: _NodoAVL[K, V]) -> _NodoAVL[K, V]:
+    """Actualiza la altura de `nodo` y lo rota si quedó desbalanceado; devuelve la nueva raíz."""
+    bal = _altura(nodo.izq) - _altura(nodo.der)
+    if bal > 1:
+        # Izq-Der: primero llevarlo a Izq-Izq
+        if _balance(nodo.izq) < 0:
+            nodo.izq = _rotar_izq(nodo.izq)  # type: ignore[arg-type]
+        return _rotar_der(nodo)
+    if bal < -1:
+        # Der-Izq: primero llevarlo a Der-Der
+        if _balance(nodo.der) > 0:
+            nodo.der = _rotar_der(nodo.der)  # type: ignore[arg-type]
+        return _rotar_izq(nodo)
+    _actualizar_altura(nodo)
+    return nodo
+
+
 class ArbolAVL(Generic[K, V]):
     """Árbol AVL simple, usado como estructura priorizada (orden por clave).
 
-    Soporta claves duplicadas guardando una lista de valores por clave.
+    Soporta claves duplicadas guardando una lista de valores por clave; entre valores de una
+    misma clave, `extraer_minimo` devuelve primero el último insertado.
+
+    Todas las operaciones son iterativas (sin recursión por nodo). Con `capacidad`, al
+    superarla se desaloja el valor que saldría último (clave máxima): así Yen mantiene en B
+    sólo los candidatos que todavía pueden llegar a ser aceptados.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, *, capacidad: Optional[int] = None) -> None:
         self._raiz: Optional[_NodoAVL[K, V]] = None
         self._tam: int = 0
+        self._capacidad = capacidad
+
+    @classmethod
+    def desde_ordenados(
+        cls,
+        items: Iterable[tuple[K, V]],
+        *,
+        capacidad: Optional[int] = None,
+    ) -> "ArbolAVL[K, V]":
+        """Construye el árbol en O(n) a partir de pares ordenados por clave (no decreciente).
+
+        Con `capacidad` se conservan sólo los primeros `capacidad` pares (los de menor clave).
+        """
+
+        claves: list[K] = []
+        listas: list[list[V]] = []
+        tam = 0
+        for clave, valor in items:
+            if capacidad is not None and tam >= capacidad:
+                break
+            if claves and clave == claves[-1]:
+                listas[-1].append(valor)
+            elif claves and clave < claves[-1]:
+                raise ValueError("desde_ordenados requiere las claves en orden no decreciente")
+            else:
+                claves.append(clave)
+                listas.append([valor])
+            tam += 1
+
+        def construir(lo: int, hi: int) -> Optional[_NodoAVL[K, V]]:
+            # Profundidad de recursión log2(n): el medio de cada rango es la raíz
+            if lo >= hi:
+                return None
+            medio = (lo + hi) // 2
+            nodo = _NodoAVL(claves[medio], listas[medio])
+            nodo.izq = construir(lo, medio)
+            nodo.der = construir(medio + 1, hi)
+            _actualizar_altura(nodo)
+            return nodo
+
+        arbol = cls(capacidad=capacidad)
+        arbol._raiz = construir(0, len(claves))
+        arbol._tam = tam
+        return arbol
 
     def __len__(self) -> int:
         return self._tam
@@ -72,88 +139,135 @@ class ArbolAVL(Generic[K, V]):
     def esta_vacio(self) -> bool:
         return self._tam == 0
 
-    def insertar(self, clave: K, valor: V) -> None:
-        self._raiz = self._insertar(self._raiz, clave, valor)
+    @property
+    def capacidad(self) -> Optional[int]:
+        return self._capacidad
+
+    def fijar_capacidad(self, capacidad: Optional[int]) -> list[tuple[K, V]]:
+        """Cambia la capacidad; devuelve los pares desalojados (de mayor a menor clave)."""
+        self._capacidad = capacidad
+        desalojados: list[tuple[K, V]] = []
+        while capacidad is not None and self._tam > capacidad:
+            desalojados.append(self.extraer_maximo())
+        return desalojados
+
+    def insertar(self, clave: K, valor: V) -> Optional[tuple[K, V]]:
+        """Inserta `(clave, valor)`; si se supera la capacidad devuelve el par desalojado."""
+        nodo = self._raiz
+        if nodo is None:
+            self._raiz = _NodoAVL(clave, [valor])
+            self._tam = 1
+            return self._desalojar()
+
+        camino: list[_NodoAVL[K, V]] = []
+        while True:
+            if clave == nodo.clave:
+                nodo.valores.append(valor)
+                self._tam += 1
+                return self._desalojar()
+            camino.append(nodo)
+            if clave < nodo.clave:
+                if nodo.izq is None:
+                    nodo.izq = _NodoAVL(clave, [valor])
+                    break
+                nodo = nodo.izq
+            else:
+                if nodo.der is None:
+                    nodo.der = _NodoAVL(clave, [valor])
+                    break
+                nodo = nodo.der
+
         self._tam += 1
+        self._rebalancear(camino)
+        return self._desalojar()
 
-    def extraer_minimo(self) -> tuple[K, V]:
-        if not self._raiz:
+    def minimo(self) -> tuple[K, V]:
+        """El par que devolvería `extraer_minimo`, sin sacarlo."""
+        nodo = self._raiz
+        if nodo is None:
             raise IndexError("El árbol AVL está vacío")
-        clave, valor, nueva_raiz = self._extraer_minimo(self._raiz)
-        self._raiz = nueva_raiz
-        self._tam -= 1
-        return clave, valor
+        while nodo.izq is not None:
+            nodo = nodo.izq
+        return nodo.clave, nodo.valores[-1]
 
-    def _insertar(self, nodo: Optional[_NodoAVL[K, V]], clave: K, valor: V) -> _NodoAVL[K, V]:
+    def maximo(self) -> tuple[K, V]:
+        """El par que devolvería `extraer_maximo` (el que saldría último), sin sacarlo."""
+        nodo = self._raiz
         if nodo is None:
-            return _NodoAVL(clave=clave, valores=[valor])
+            raise IndexError("El árbol AVL está vacío")
+        while nodo.der is not None:
+            nodo = nodo.der
+        return nodo.clave, nodo.valores[0]
 
-        if clave == nodo.clave:
-            nodo.valores.append(valor)
-            return nodo
-        elif clave < nodo.clave:
-            nodo.izq = self._insertar(nodo.izq, clave, valor)
-        else:
-            nodo.der = self._insertar(nodo.der, clave, valor)
-
-        _actualizar_altura(nodo)
-        bal = _balance(nodo)
-
-        # Izq-Izq
-        if bal > 1 and nodo.izq and clave < nodo.izq.clave:
-            return _rotar_der(nodo)
-        # Der-Der
-        if bal < -1 and nodo.der and clave > nodo.der.clave:
-            return _rotar_izq(nodo)
-        # Izq-Der
-        if bal > 1 and nodo.izq and clave > nodo.izq.clave:
-            nodo.izq = _rotar_izq(nodo.izq)
-            return _rotar_der(nodo)
-        # Der-Izq
-        if bal < -1 and nodo.der and clave < nodo.der.clave:
-            nodo.der = _rotar_der(nodo.der)
-            return _rotar_izq(nodo)
-
-        return nodo
-
-    def _extraer_minimo(self, nodo: _NodoAVL[K, V]) -> tuple[K, V, Optional[_NodoAVL[K, V]]]:
-        if nodo.izq is None:
-            # Este nodo tiene la clave mínima
-            valor = nodo.valores.pop()
-            if nodo.valores:
-                return nodo.clave, valor, nodo
-            return nodo.clave, valor, nodo.der
-
-        clave, valor, nueva_izq = self._extraer_minimo(nodo.izq)
-        nodo.izq = nueva_izq
-
-        _actualizar_altura(nodo)
-        bal = _balance(nodo)
-
-        # Rebalanceo
-        if bal > 1:
-            assert nodo.izq is not None
-            if _balance(nodo.izq) >= 0:
-                return clave, valor, _rotar_der(nodo)
-            nodo.izq = _rotar_izq(nodo.izq)
-            return clave, valor, _rotar_der(nodo)
-
-        if bal < -1:
-            assert nodo.der is not None
-            if _balance(nodo.der) <= 0:
-                return clave, valor, _rotar_izq(nodo)
-            nodo.der = _rotar_der(nodo.der)
-            return clave, valor, _rotar_izq(nodo)
-
-        return clave, valor, nodo
-
-    def items_ordenados(self) -> Iterable[tuple[K, V]]:
-        yield from self._inorder(self._raiz)
-
-    def _inorder(self, nodo: Optional[_NodoAVL[K, V]]):
+    def extraer_minimo(self) -> tuple[K, V]:
+        nodo = self._raiz
+        if nodo is None:
+            raise IndexError("El árbol AVL está vacío")
+        camino: list[_NodoAVL[K, V]] = []
+        while nodo.izq is not None:
+            camino.append(nodo)
+            nodo = nodo.izq
+
+        valor = nodo.valores.pop()
+        self._tam -= 1
+        if not nodo.valores:
+            # Sin valores: el hijo derecho ocupa su lugar
+            if camino:
+                camino[-1].izq = nodo.der
+            else:
+                self._raiz = nodo.der
+            self._rebalancear(camino)
+        return nodo.clave, valor
+
+    def extraer_maximo(self) -> tuple[K, V]:
+        nodo = self._raiz
         if nodo is None:
-            return
-        yield from self._inorder(nodo.izq)
-        for v in nodo.valores:
-            yield nodo.clave, v
-        yield from self._inorder(nodo.der)
+            raise IndexError("El árbol AVL está vacío")
+        camino: list[_NodoAVL[K, V]] = []
+        while nodo.der is not None:
+            camino.append(nodo)
+            nodo = nodo.der
+
+        # El primero insertado de la clave máxima es el que `extraer_minimo` daría último
+        valor = nodo.valores.pop(0)
+        self._tam -= 1
+        if not nodo.valores:
+            if camino:
+                camino[-1].der = nodo.izq
+            else:
+                self._raiz = nodo.izq
+            self._rebalancear(camino)
+        return nodo.clave, valor
+
+    def items_ordenados(self) -> Iterator[tuple[K, V]]:
+        pila: list[_NodoAVL[K, V]] = []
+        nodo = self._raiz
+        while pila or nodo is not None:
+            while nodo is not None:
+                pila.append(nodo)
+                nodo = nodo.izq
+            nodo = pila.pop()
+            for v in nodo.valores:
+                yield nodo.clave, v
+            nodo = nodo.der
+
+    def _rebalancear(self, camino: list[_NodoAVL[K, V]]) -> None:
+        """Sube por `camino` (raíz primero) corrigiendo alturas y rotando donde haga falta."""
+        for i in range(len(camino) - 1, -1, -1):
+            nodo = camino[i]
+            antes = nodo.altura
+            nueva = _equilibrar(nodo)
+            if i == 0:
+                self._raiz = nueva
+            elif camino[i - 1].izq is nodo:
+                camino[i - 1].izq = nueva
+            else:
+                camino[i - 1].der = nueva
+            if nueva is nodo and nodo.altura == antes:
+                # Ni rotación ni cambio de altura: los ancestros no se enteran
+                break
+
+    def _desalojar(self) -> Optional[tuple[K, V]]:
+        if self._capacidad is not None and self._tam > self._capacidad:
+            return self.extraer_maximo()
+        return None
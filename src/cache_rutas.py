@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import hashlib
+import pickle
+import sqlite3
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+from .a_star import Coord
+from .grid import Arista, ConfigMapa
+from .yen_ksp import Ruta
+
+_VERSION_FORMATO = 1
+
+
+def huella_mapa(
+    conf: ConfigMapa,
+    obstaculos: Iterable[Arista],
+    tiempos_calles: dict[Arista, int],
+) -> str:
+    """Huella (hex) del mapa: dimensiones + calles bloqueadas + tiempos de cruce.
+
+    No depende del orden de iteración de los sets/dicts; cualquier cambio del mapa la cambia.
+    """
+
+    h = hashlib.blake2b(digest_size=16)
+    h.update(array("q", [_VERSION_FORMATO, conf.filas, conf.columnas]).tobytes())
+
+    obs = array("q")
+    for (a, b) in sorted(obstaculos):
+        obs.extend((a[0], a[1], b[0], b[1]))
+    h.update(array("q", [len(obs)]).tobytes())
+    h.update(obs.tobytes())
+
+    tiempos = array("q")
+    for (a, b), t in sorted(tiempos_calles.items()):
+        tiempos.extend((a[0], a[1], b[0], b[1], int(t)))
+    h.update(tiempos.tobytes())
+    return h.hexdigest()
+
+
+def clave_consulta(huella: str, inicio: Coord, fin: Coord, k: int, criterio: str) -> str:
+    return f"{huella}|{inicio[0]},{inicio[1]}|{fin[0]},{fin[1]}|{int(k)}|{criterio}"
+
+
+class CacheRutas:
+    """Caché de resultados de Yen por `(mapa, inicio, fin, k, criterio)`.
+
+    - Memoria: LRU acotado por bytes (`max_bytes`, tamaño de las rutas serializadas).
+    - Disco (opcional, `ruta_disco`): sqlite que sobrevive reinicios; un acierto en disco se
+      sube a memoria.
+
+    La huella del mapa va en la clave, así que un mapa distinto nunca devuelve rutas viejas;
+    `invalidar_mapa(huella)` además libera las entradas del mapa anterior (`disco=False`:
+    sólo de memoria).
+    No cachear resultados calculados con `plazo`: pueden estar incompletos.
+    """
+
+    def __init__(self, *, max_bytes: int = 32 * 1024 * 1024, ruta_disco: Optional[Path] = None) -> None:
+        self.max_bytes = int(max_bytes)
+        self._memoria: OrderedDict[str, bytes] = OrderedDict()
+        self._bytes = 0
+
+        self.aciertos_memoria = 0
+        self.aciertos_disco = 0
+        self.fallos = 0
+
+        self._db: Optional[sqlite3.Connection] = None
+        if ruta_disco is not None:
+            ruta_disco.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(ruta_disco), check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS rutas ("
+                " clave TEXT PRIMARY KEY, huella TEXT NOT NULL, datos BLOB NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS rutas_huella ON rutas (huella)")
+            self._db.commit()
+
+    # --- Contadores ---
+
+    @property
+    def aciertos(self) -> int:
+        return self.aciertos_memoria + self.aciertos_disco
+
+    @property
+    def tasa_aciertos(self) -> float:
+        total = self.aciertos + self.fallos
+        return self.aciertos / total if total else 0.0
+
+    @property
+    def bytes_en_memoria(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._memoria)
+
+    # --- Operaciones ---
+
+    def obtener(self, clave: str) -> Optional[list[Ruta]]:
+        datos = self._memoria.get(clave)
+        if datos is not None:
+            self._memoria.move_to_end(clave)
+            self.aciertos_memoria += 1
+            return _cargar(datos)
+
+        if self._db is not None:
+            fila = self._db.execute("SELECT datos FROM rutas WHERE clave = ?", (clave,)).fetchone()
+            if fila is not None:
+                datos = bytes(fila[0])
+                rutas = _cargar(datos)
+                if rutas is not None:
+                    self.aciertos_disco += 1
+                    self._en_memoria(clave, datos)
+                    return rutas
+
+        self.fallos += 1
+        return None
+
+    def guardar(self, clave: str, rutas: list[Ruta]) -> None:
+        datos = pickle.dumps((_VERSION_FORMATO, rutas), protocol=pickle.HIGHEST_PROTOCOL)
+        self._en_memoria(clave, datos)
+        if self._db is not None:
+            huella = clave.split("|", 1)[0]
+            self._db.execute(
+                "INSERT OR REPLACE INTO rutas (clave, huella, datos) VALUES (?, ?, ?)",
+                (clave, huella, datos),
+            )
+            self._db.commit()
+
+    def obtener_o_calcular(self, clave: str, calcular: Callable[[], list[Ruta]]) -> list[Ruta]:
+        rutas = self.obtener(clave)
+        if rutas is None:
+            rutas = calcular()
+            self.guardar(clave, rutas)
+        return rutas
+
+    def invalidar_mapa(self, huella: str, *, disco: bool = True) -> None:
+        """Borra todas las entradas del mapa con esa huella de memoria y, con `disco`, del sqlite.
+
+        Si el sqlite es compartido (varias sesiones o procesos), `disco=False`: otro usuario
+        puede seguir consultando ese mapa.
+        """
+        prefijo = huella + "|"
+        for clave in [c for c in self._memoria if c.startswith(prefijo)]:
+            self._bytes -= len(self._memoria.pop(clave))
+        if disco and self._db is not None:
+            self._db.execute("DELETE FROM rutas WHERE huella = ?", (huella,))
+            self._db.commit()
+
+    def limpiar(self) -> None:
+        self._memoria.clear()
+        self._bytes = 0
+        if self._db is not None:
+            self._db.execute("DELETE FROM rutas")
+            self._db.commit()
+
+    def cerrar(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _en_memoria(self, clave: str, datos: bytes) -> None:
+        anterior = self._memoria.pop(clave, None)
+        if anterior is not None:
+            self._bytes -= len(anterior)
+        if len(datos) > self.max_bytes:
+            return
+        self._memoria[clave] = datos
+        self._bytes += len(datos)
+        # Desalojar las menos usadas recientemente hasta entrar en el límite
+        while self._bytes > self.max_bytes:
+            _clave, viejo = self._memoria.popitem(last=False)
+            self._bytes -= len(viejo)
+
+
+def _cargar(datos: bytes) -> Optional[list[Ruta]]:
+    version, rutas = pickle.loads(datos)
+    if version != _VERSION_FORMATO:
+        return None
+    return rutas
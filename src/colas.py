@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from typing import Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Con pesos enteros hasta este máximo `cola="auto"` usa Dial. Por encima, recorrer cubetas
+# vacías cuesta más que `heapq` (en C); el montículo radix queda como opción explícita.
+MAX_PESO_DIAL = 1024
+
+
+class ColaDial(Generic[T]):
+    """Cola de prioridad de Dial: cubetas circulares indexadas por clave entera.
+
+    Sirve para claves *monótonas* (nunca menores que la última extraída) que no superan a
+    la mínima pendiente en más de `ancho`: en A* con heurística consistente y pesos enteros
+    `<= w`, `ancho = 2 * w`. Insertar y extraer son O(1) (amortizado sobre el rango de claves).
+    A igual clave sale primero el último insertado.
+    """
+
+    __slots__ = ("_cubetas", "_n", "_actual", "_tam")
+
+    def __init__(self, ancho: int) -> None:
+        if ancho < 0:
+            raise ValueError("ancho debe ser >= 0")
+        self._n = int(ancho) + 1
+        self._cubetas: list[list[T]] = [[] for _ in range(self._n)]
+        self._actual = 0
+        self._tam = 0
+
+    def __len__(self) -> int:
+        return self._tam
+
+    def insertar(self, clave: int, valor: T) -> None:
+        if self._tam == 0 and not self._actual <= clave < self._actual + self._n:
+            # Vacía: la cubeta actual puede moverse (sólo ocurre antes de la primera extracción
+            # en un uso monótono; después, `_actual` es la última clave extraída)
+            self._actual = clave
+        elif not self._actual <= clave < self._actual + self._n:
+            raise ValueError(
+                f"Clave {clave} fuera del rango de la cola de Dial "
+                f"[{self._actual}, {self._actual + self._n - 1}]"
+            )
+        self._cubetas[clave % self._n].append(valor)
+        self._tam += 1
+
+    def extraer(self) -> tuple[int, T]:
+        if self._tam == 0:
+            raise IndexError("La cola está vacía")
+        cubetas = self._cubetas
+        n = self._n
+        actual = self._actual
+        while not cubetas[actual % n]:
+            actual += 1
+        self._actual = actual
+        self._tam -= 1
+        return actual, cubetas[actual % n].pop()
+
+
+class MonticuloRadix(Generic[T]):
+    """Montículo radix para claves enteras monótonas y no negativas (sin límite de rango).
+
+    La cubeta de cada clave es la cantidad de bits en que difiere de la última extraída;
+    al vaciarse la cubeta 0 se redistribuye la primera cubeta no vacía. Cada elemento baja
+    de cubeta a lo sumo `log2(rango)` veces. A igual clave sale primero el último insertado.
+    """
+
+    __slots__ = ("_cubetas", "_ultimo", "_tam")
+
+    def __init__(self) -> None:
+        self._cubetas: list[list[tuple[int, T]]] = [[] for _ in range(65)]
+        self._ultimo = 0
+        self._tam = 0
+
+    def __len__(self) -> int:
+        return self._tam
+
+    def insertar(self, clave: int, valor: T) -> None:
+        if clave < self._ultimo:
+            raise ValueError(f"Clave {clave} menor que la última extraída ({self._ultimo})")
+        self._cubetas[(clave ^ self._ultimo).bit_length()].append((clave, valor))
+        self._tam += 1
+
+    def extraer(self) -> tuple[int, T]:
+        if self._tam == 0:
+            raise IndexError("El montículo está vacío")
+        cubetas = self._cubetas
+        if not cubetas[0]:
+            i = 1
+            while not cubetas[i]:
+                i += 1
+            cubeta = cubetas[i]
+            cubetas[i] = []
+            ultimo = min(clave for clave, _v in cubeta)
+            self._ultimo = ultimo
+            for clave, valor in cubeta:
+                cubetas[(clave ^ ultimo).bit_length()].append((clave, valor))
+        self._tam -= 1
+        return cubetas[0].pop()
+
+
+def elegir_cola(cola: str, peso_maximo: Optional[float]) -> str:
+    """Resuelve `cola="auto"`: Dial si los pesos son enteros con máximo conocido y chico.
+
+    `peso_maximo=None` significa pesos no enteros o desconocidos (sólo sirve el heap).
+    """
+
+    if cola not in ("auto", "heap", "dial", "radix"):
+        raise ValueError(f"Cola desconocida: {cola!r} (usar 'auto', 'heap', 'dial' o 'radix')")
+    if cola == "heap":
+        return cola
+    if peso_maximo is None:
+        if cola != "auto":
+            raise ValueError(f"La cola {cola!r} requiere pesos enteros con máximo conocido")
+        return "heap"
+    if cola == "auto":
+        return "dial" if peso_maximo <= MAX_PESO_DIAL else "heap"
+    return cola
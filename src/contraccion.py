@@ -0,0 +1,317 @@
+from __future__ import annotations
+
+import heapq
+import pickle
+from array import array
+from pathlib import Path
+from typing import Iterable, Optional
+
+from .a_star import Coord, ResultadoAEstrella
+from .grafo import INF, GrafoCompilado, a_estrella_grafo
+
+_VERSION_FORMATO = 1
+
+
+class JerarquiaContraccion:
+    """Contraction Hierarchies sobre un `GrafoCompilado` estático.
+
+    Tras contraer todos los nodos queda un grafo "hacia arriba" en formato CSR:
+    las aristas salientes de `u` son `destino[primera[u]:primera[u + 1]]` (todas hacia nodos
+    de mayor rango), con su `peso` y el nodo `medio` del atajo (-1 si es una calle real).
+
+    Como las calles son no dirigidas, el mismo grafo sirve para la búsqueda desde
+    `inicio` y desde `fin`.
+    """
+
+    def __init__(
+        self,
+        grafo: GrafoCompilado,
+        rango: array,
+        primera: array,
+        destino: array,
+        peso: array,
+        medio: array,
+    ) -> None:
+        self.grafo = grafo
+        self.rango = rango
+        self.primera = primera
+        self.destino = destino
+        self.peso = peso
+        self.medio = medio
+
+    @property
+    def cantidad_atajos(self) -> int:
+        return sum(1 for m in self.medio if m >= 0)
+
+    # --- Consultas ---
+
+    def consultar(
+        self,
+        inicio: Coord,
+        fin: Coord,
+        *,
+        nodos_bloqueados: Optional[Iterable[Coord]] = None,
+        aristas_bloqueadas: Optional[Iterable[tuple[Coord, Coord]]] = None,
+    ) -> Optional[ResultadoAEstrella]:
+        """Ruta más corta `inicio -> fin`.
+
+        La jerarquía sólo es válida para el mapa con el que se construyó: si hay bloqueos
+        extra (p. ej. los de Yen), se recurre a `a_estrella_grafo` sobre el grafo original.
+        """
+
+        nodos = set(nodos_bloqueados) if nodos_bloqueados else set()
+        aristas = set(aristas_bloqueadas) if aristas_bloqueadas else set()
+        if nodos or aristas:
+            return a_estrella_grafo(
+                self.grafo,
+                inicio,
+                fin,
+                nodos_bloqueados=nodos,
+                aristas_bloqueadas=aristas,
+            )
+
+        if not (self.grafo.contiene(inicio) and self.grafo.contiene(fin)):
+            return None
+        if inicio == fin:
+            return ResultadoAEstrella(camino=[inicio], costo_total=0.0)
+
+        s = self.grafo.id_de(inicio)
+        t = self.grafo.id_de(fin)
+        costo, m, padres = self._buscar(s, t)
+        if m < 0:
+            return None
+
+        padre_ad, padre_at = padres
+        ids_ad = [m]
+        while ids_ad[-1] != s:
+            ids_ad.append(padre_ad[ids_ad[-1]])
+        ids_ad.reverse()
+        ids_at = [m]
+        while ids_at[-1] != t:
+            ids_at.append(padre_at[ids_at[-1]])
+        saltos = ids_ad + ids_at[1:]
+
+        ids = [s]
+        for a, b in zip(saltos[:-1], saltos[1:]):
+            self._desempacar(a, b, ids)
+        return ResultadoAEstrella(camino=self.grafo.camino_a_coords(ids), costo_total=costo)
+
+    def distancia(self, inicio: Coord, fin: Coord) -> float:
+        """Sólo el costo (sin desempacar el camino); `INF` si no hay ruta."""
+        if inicio == fin:
+            return 0.0
+        costo, _m, _padres = self._buscar(self.grafo.id_de(inicio), self.grafo.id_de(fin))
+        return costo
+
+    def _buscar(self, s: int, t: int) -> tuple[float, int, tuple[dict[int, int], dict[int, int]]]:
+        primera, destino, peso = self.primera, self.destino, self.peso
+        dist: tuple[dict[int, float], dict[int, float]] = ({s: 0.0}, {t: 0.0})
+        padre: tuple[dict[int, int], dict[int, int]] = ({}, {})
+        abiertos: tuple[list[tuple[float, int]], list[tuple[float, int]]] = ([(0.0, s)], [(0.0, t)])
+        mejor = INF
+        encuentro = -1
+
+        while abiertos[0] or abiertos[1]:
+            for lado in (0, 1):
+                heap = abiertos[lado]
+                if not heap:
+                    continue
+                du, u = heapq.heappop(heap)
+                if du >= mejor:
+                    # Este lado ya no puede mejorar la ruta
+                    heap.clear()
+                    continue
+                if du > dist[lado][u]:
+                    continue
+                otro = dist[1 - lado].get(u)
+                if otro is not None and du + otro < mejor:
+                    mejor = du + otro
+                    encuentro = u
+                for i in range(primera[u], primera[u + 1]):
+                    v = destino[i]
+                    nd = du + peso[i]
+                    if nd < dist[lado].get(v, INF):
+                        dist[lado][v] = nd
+                        padre[lado][v] = u
+                        heapq.heappush(heap, (nd, v))
+
+        return mejor, encuentro, padre
+
+    def _arista(self, a: int, b: int) -> int:
+        bajo, alto = (a, b) if self.rango[a] < self.rango[b] else (b, a)
+        for i in range(self.primera[bajo], self.primera[bajo + 1]):
+            if self.destino[i] == alto:
+                return i
+        raise KeyError((a, b))
+
+    def _desempacar(self, a: int, b: int, ids: list[int]) -> None:
+        """Agrega a `ids` las intersecciones de `a` (excluida) a `b` (incluida)."""
+        pila = [(a, b)]
+        while pila:
+            x, y = pila.pop()
+            m = self.medio[self._arista(x, y)]
+            if m < 0:
+                ids.append(y)
+            else:
+                # Procesar (x, m) antes que (m, y)
+                pila.append((m, y))
+                pila.append((x, m))
+
+    # --- Persistencia ---
+
+    def guardar(self, ruta_archivo: Path) -> None:
+        """Serializa la jerarquía (y su grafo) para reusarla entre procesos/reinicios."""
+        ruta_archivo.parent.mkdir(parents=True, exist_ok=True)
+        datos = {
+            "version": _VERSION_FORMATO,
+            "grafo": self.grafo,
+            "rango": self.rango,
+            "primera": self.primera,
+            "destino": self.destino,
+            "peso": self.peso,
+            "medio": self.medio,
+        }
+        with ruta_archivo.open("wb") as f:
+            pickle.dump(datos, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def cargar(cls, ruta_archivo: Path) -> "JerarquiaContraccion":
+        with ruta_archivo.open("rb") as f:
+            datos = pickle.load(f)
+        if datos.get("version") != _VERSION_FORMATO:
+            raise ValueError(f"Formato de jerarquía no soportado: {datos.get('version')}")
+        return cls(
+            datos["grafo"],
+            datos["rango"],
+            datos["primera"],
+            datos["destino"],
+            datos["peso"],
+            datos["medio"],
+        )
+
+
+def _hay_testigo(
+    adyacencia: list[dict[int, tuple[float, int]]],
+    origen: int,
+    excluido: int,
+    objetivos: dict[int, float],
+    limite_asentados: int,
+) -> set[int]:
+    """Dijkstra local desde `origen` sin pasar por `excluido`.
+
+    Devuelve los objetivos `w` alcanzados con costo <= `objetivos[w]` (no necesitan atajo).
+    """
+
+    tope = max(objetivos.values())
+    dist: dict[int, float] = {origen: 0.0}
+    abiertos: list[tuple[float, int]] = [(0.0, origen)]
+    cubiertos: set[int] = set()
+    asentados = 0
+
+    while abiertos and asentados < limite_asentados:
+        du, u = heapq.heappop(abiertos)
+        if du > dist[u]:
+            continue
+        if du > tope:
+            break
+        asentados += 1
+        if u in objetivos and du <= objetivos[u]:
+            cubiertos.add(u)
+            if len(cubiertos) == len(objetivos):
+                break
+        for v, (w, _m) in adyacencia[u].items():
+            if v == excluido:
+                continue
+            nd = du + w
+            if nd < dist.get(v, INF):
+                dist[v] = nd
+                heapq.heappush(abiertos, (nd, v))
+
+    return cubiertos
+
+
+def _atajos(
+    adyacencia: list[dict[int, tuple[float, int]]],
+    v: int,
+    limite_asentados: int,
+) -> list[tuple[int, int, float]]:
+    """Atajos (u, w, costo) que haría falta agregar al contraer `v`."""
+    vecinos = list(adyacencia[v].items())
+    atajos: list[tuple[int, int, float]] = []
+    for i, (u, (wu, _mu)) in enumerate(vecinos):
+        objetivos = {w: wu + ww for w, (ww, _mw) in vecinos[i + 1 :]}
+        if not objetivos:
+            continue
+        cubiertos = _hay_testigo(adyacencia, u, v, objetivos, limite_asentados)
+        for w, c in objetivos.items():
+            if w not in cubiertos:
+                atajos.append((u, w, c))
+    return atajos
+
+
+def construir_jerarquia(grafo: GrafoCompilado, *, limite_testigo: int = 60) -> JerarquiaContraccion:
+    """Contrae todos los nodos del grafo (orden por diferencia de aristas, con actualización perezosa).
+
+    `limite_testigo` acota los nodos asentados en cada búsqueda de testigos: un límite más
+    bajo construye más rápido pero agrega atajos de sobra (nunca rompe la exactitud).
+
+    Es un preprocesamiento caro (segundos en mapas medianos); está pensado para construir una
+    vez, `guardar` y luego `cargar` mientras el mapa no cambie.
+    """
+
+    n = grafo.n
+    desp = grafo.desplazamiento
+    adyacencia: list[dict[int, tuple[float, int]]] = [{} for _ in range(n)]
+    for u in range(n):
+        base = u * 4
+        for d in range(4):
+            if not grafo.bloqueada[base + d]:
+                adyacencia[u][u + desp[d]] = (grafo.costo[base + d], -1)
+
+    contraidos_vecinos = [0] * n
+
+    def prioridad(v: int) -> int:
+        return len(_atajos(adyacencia, v, limite_testigo)) - len(adyacencia[v]) + contraidos_vecinos[v]
+
+    cola: list[tuple[int, int]] = [(prioridad(v), v) for v in range(n)]
+    heapq.heapify(cola)
+
+    rango = array("l", [0]) * n
+    subida: list[list[tuple[int, float, int]]] = [[] for _ in range(n)]
+    siguiente_rango = 0
+
+    while cola:
+        _p, v = heapq.heappop(cola)
+        # Actualización perezosa: si la prioridad empeoró, reinsertar
+        nueva = prioridad(v)
+        if cola and nueva > cola[0][0]:
+            heapq.heappush(cola, (nueva, v))
+            continue
+
+        for u, w, c in _atajos(adyacencia, v, limite_testigo):
+            actual = adyacencia[u].get(w)
+            if actual is None or c < actual[0]:
+                adyacencia[u][w] = (c, v)
+                adyacencia[w][u] = (c, v)
+
+        rango[v] = siguiente_rango
+        siguiente_rango += 1
+        for u, (w, m) in adyacencia[v].items():
+            subida[v].append((u, w, m))
+            del adyacencia[u][v]
+            contraidos_vecinos[u] += 1
+        adyacencia[v].clear()
+
+    primera = array("l", [0]) * (n + 1)
+    destino = array("l")
+    peso = array("d")
+    medio = array("l")
+    for u in range(n):
+        primera[u] = len(destino)
+        for v, w, m in subida[u]:
+            destino.append(v)
+            peso.append(w)
+            medio.append(m)
+    primera[n] = len(destino)
+
+    return JerarquiaContraccion(grafo, rango, primera, destino, peso, medio)
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import heapq
+from array import array
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from .a_star import Coord, ResultadoAEstrella
+from .grafo import INF, GrafoCompilado
+from .grid import Arista
+
+
+@dataclass(frozen=True)
+class CambioCalle:
+    """Evento sobre una calle: bloquear/desbloquear y/o cambiar su tiempo de cruce."""
+
+    arista: Arista
+    bloqueada: Optional[bool] = None
+    tiempo: Optional[int] = None
+
+
+class PlanificadorDStarLite:
+    """Replanificación incremental (D* Lite) de la ruta `inicio -> fin` sobre un `GrafoCompilado`.
+
+    Busca hacia atrás desde `fin` (g = costo hasta `fin`), así que tras un lote de cambios
+    sólo se reparan los nodos cuya distancia cambió. `mover_inicio` permite avanzar el
+    vehículo sin perder el estado (término `km` de D* Lite).
+
+    Ojo: `aplicar_cambios` modifica el grafo recibido (los eventos describen el mapa real).
+    """
+
+    def __init__(self, grafo: GrafoCompilado, inicio: Coord, fin: Coord) -> None:
+        if not (grafo.contiene(inicio) and grafo.contiene(fin)):
+            raise ValueError("inicio y fin deben estar dentro del mapa")
+        self.grafo = grafo
+        self._s = grafo.id_de(inicio)
+        self._t = grafo.id_de(fin)
+        self._km = 0.0
+        self._escala = grafo.costo_min
+
+        n = grafo.n
+        self._g = array("d", [INF]) * n
+        self._rhs = array("d", [INF]) * n
+        self._rhs[self._t] = 0.0
+        # Cola con borrado perezoso: `_clave_en_cola[u]` es la clave vigente de u (o None)
+        self._cola: list[tuple[float, float, int]] = []
+        self._clave_en_cola: dict[int, tuple[float, float]] = {}
+        self._insertar(self._t, self._clave(self._t))
+
+        self.expansiones = 0  # nodos expandidos en la última (re)planificación
+
+    # --- API ---
+
+    @property
+    def inicio(self) -> Coord:
+        return self.grafo.coord_de(self._s)
+
+    @property
+    def fin(self) -> Coord:
+        return self.grafo.coord_de(self._t)
+
+    def planificar(self) -> Optional[ResultadoAEstrella]:
+        """Completa/repara la búsqueda y devuelve la ruta actual (None si no hay)."""
+        self.expansiones = 0
+        self._calcular_ruta_mas_corta()
+        return self._extraer_camino()
+
+    def aplicar_cambios(self, cambios: Iterable[CambioCalle]) -> Optional[ResultadoAEstrella]:
+        """Aplica un lote de eventos al grafo y repara la ruta tocando sólo los nodos afectados."""
+        grafo = self.grafo
+        afectados: set[int] = set()
+        for cambio in cambios:
+            a, b = cambio.arista
+            if cambio.tiempo is not None:
+                grafo.fijar_tiempo(a, b, cambio.tiempo)
+            if cambio.bloqueada is not None:
+                grafo.fijar_bloqueo(a, b, cambio.bloqueada)
+            afectados.add(grafo.id_de(a))
+            afectados.add(grafo.id_de(b))
+
+        if grafo.costo_min < self._escala:
+            # Un costo bajó del mínimo: la heurística dejaría de ser consistente
+            self._escala = grafo.costo_min
+            self._reordenar_cola()
+
+        for u in afectados:
+            self._actualizar_vertice(u)
+        return self.planificar()
+
+    def mover_inicio(self, nuevo_inicio: Coord) -> Optional[ResultadoAEstrella]:
+        """Mueve el origen (p. ej. el vehículo avanzó) conservando el estado de la búsqueda."""
+        nuevo = self.grafo.id_de(nuevo_inicio)
+        self._km += self._h(self._s, nuevo)
+        self._s = nuevo
+        return self.planificar()
+
+    # --- D* Lite ---
+
+    def _h(self, a: int, b: int) -> float:
+        fa, ca = divmod(a, self.grafo.columnas)
+        fb, cb = divmod(b, self.grafo.columnas)
+        return self._escala * (abs(fa - fb) + abs(ca - cb))
+
+    def _clave(self, u: int) -> tuple[float, float]:
+        m = min(self._g[u], self._rhs[u])
+        return (m + self._h(self._s, u) + self._km, m)
+
+    def _insertar(self, u: int, clave: tuple[float, float]) -> None:
+        self._clave_en_cola[u] = clave
+        heapq.heappush(self._cola, (clave[0], clave[1], u))
+
+    def _tope(self) -> tuple[float, float]:
+        cola = self._cola
+        while cola:
+            k1, k2, u = cola[0]
+            if self._clave_en_cola.get(u) == (k1, k2):
+                return (k1, k2)
+            heapq.heappop(cola)
+        return (INF, INF)
+
+    def _reordenar_cola(self) -> None:
+        pendientes = list(self._clave_en_cola)
+        self._cola = []
+        self._clave_en_cola = {}
+        for u in pendientes:
+            self._insertar(u, self._clave(u))
+
+    def _rhs_desde_vecinos(self, u: int) -> float:
+        grafo = self.grafo
+        base = u * 4
+        mejor = INF
+        for d in range(4):
+            if grafo.bloqueada[base + d]:
+                continue
+            c = grafo.costo[base + d] + self._g[u + grafo.desplazamiento[d]]
+            if c < mejor:
+                mejor = c
+        return mejor
+
+    def _actualizar_vertice(self, u: int) -> None:
+        if u != self._t:
+            self._rhs[u] = self._rhs_desde_vecinos(u)
+        self._clave_en_cola.pop(u, None)
+        if self._g[u] != self._rhs[u]:
+            self._insertar(u, self._clave(u))
+
+    def _actualizar_vecinos(self, u: int) -> None:
+        grafo = self.grafo
+        base = u * 4
+        for d in range(4):
+            if not grafo.bloqueada[base + d]:
+                self._actualizar_vertice(u + grafo.desplazamiento[d])
+
+    def _calcular_ruta_mas_corta(self) -> None:
+        s = self._s
+        g, rhs = self._g, self._rhs
+        while True:
+            tope = self._tope()
+            if not (tope < self._clave(s) or rhs[s] != g[s]):
+                break
+            if tope == (INF, INF):
+                break
+            _k1, _k2, u = heapq.heappop(self._cola)
+            del self._clave_en_cola[u]
+            self.expansiones += 1
+
+            nueva = self._clave(u)
+            if tope < nueva:
+                self._insertar(u, nueva)
+            elif g[u] > rhs[u]:
+                g[u] = rhs[u]
+                self._actualizar_vecinos(u)
+            else:
+                g[u] = INF
+                self._actualizar_vertice(u)
+                self._actualizar_vecinos(u)
+
+    def _extraer_camino(self) -> Optional[ResultadoAEstrella]:
+        grafo = self.grafo
+        s, t = self._s, self._t
+        if self._g[s] == INF and s != t:
+            return None
+
+        ids = [s]
+        u = s
+        while u != t:
+            base = u * 4
+            mejor, siguiente = INF, -1
+            for d in range(4):
+                if grafo.bloqueada[base + d]:
+                    continue
+                v = u + grafo.desplazamiento[d]
+                c = grafo.costo[base + d] + self._g[v]
+                if c < mejor:
+                    mejor, siguiente = c, v
+            if siguiente < 0 or len(ids) > grafo.n:
+                return None
+            ids.append(siguiente)
+            u = siguiente
+
+        costo = 0.0
+        for a, b in zip(ids[:-1], ids[1:]):
+            costo += grafo.costo[a * 4 + grafo.direccion(a, b)]
+        return ResultadoAEstrella(camino=grafo.camino_a_coords(ids), costo_total=costo)
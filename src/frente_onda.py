@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+from typing import Iterable, Optional
+
+import numpy as np
+
+from .a_star import Coord
+from .grafo import ABAJO, ARRIBA, DERECHA, IZQUIERDA, GrafoCompilado
+from .grid import Arista, ConfigMapa
+
+
+def calles_abiertas(grafo: GrafoCompilado) -> np.ndarray:
+    """Máscara `bool` (filas, columnas, 4): `[f, c, d]` es True si se puede salir de (f, c) en dirección d."""
+    bloqueada = np.frombuffer(grafo.bloqueada, dtype=np.uint8).reshape(grafo.filas, grafo.columnas, 4)
+    return bloqueada == 0
+
+
+def calles_abiertas_desde_obstaculos(conf: ConfigMapa, obstaculos: Iterable[Arista]) -> np.ndarray:
+    """Igual que `calles_abiertas`, pero directo desde el set de calles bloqueadas (sin compilar el grafo)."""
+    abiertas = np.ones((conf.filas, conf.columnas, 4), dtype=bool)
+    abiertas[0, :, ARRIBA] = False
+    abiertas[-1, :, ABAJO] = False
+    abiertas[:, 0, IZQUIERDA] = False
+    abiertas[:, -1, DERECHA] = False
+    for (f1, c1), (f2, c2) in obstaculos:
+        if f1 == f2:
+            c = min(c1, c2)
+            abiertas[f1, c, DERECHA] = False
+            abiertas[f1, c + 1, IZQUIERDA] = False
+        else:
+            f = min(f1, f2)
+            abiertas[f, c1, ABAJO] = False
+            abiertas[f + 1, c1, ARRIBA] = False
+    return abiertas
+
+
+def campo_distancias(
+    abiertas: np.ndarray,
+    origen: Coord,
+    *,
+    destino: Optional[Coord] = None,
+) -> np.ndarray:
+    """BFS por frente de onda: pasos desde `origen` a cada intersección (`int32`, -1 = inalcanzable).
+
+    El frente es un arreglo de ids (`fila * columnas + columna`) y cada paso se expande con
+    unas pocas operaciones NumPy (máscara por dirección + desplazamiento), sin bucle por nodo.
+    Con `destino`, se detiene en cuanto lo alcanza (el resto del campo queda parcial).
+
+    Como las calles son no dirigidas, el campo desde `fin` es la distancia exacta *hasta* `fin`
+    en pasos: sirve como heurística exacta del criterio distancia (o cota, multiplicada por el
+    costo mínimo, en ETA).
+    """
+
+    filas, columnas = abiertas.shape[:2]
+    n = filas * columnas
+    salidas = abiertas.reshape(n, 4)
+    desplazamiento = (-columnas, columnas, -1, 1)
+
+    campo = np.full(n, -1, dtype=np.int32)
+    marca = np.zeros(n, dtype=np.int64)
+    objetivo = -1 if destino is None else destino[0] * columnas + destino[1]
+
+    frente = np.array([origen[0] * columnas + origen[1]], dtype=np.int64)
+    campo[frente] = 0
+    pasos = 0
+    while frente.size and (objetivo < 0 or campo[objetivo] < 0):
+        pasos += 1
+        candidatos = np.concatenate(
+            [frente[salidas[frente, d]] + desplazamiento[d] for d in range(4)]
+        )
+        candidatos = candidatos[campo[candidatos] < 0]
+        if not candidatos.size:
+            break
+        # Quitar repetidos sin ordenar: `marca` guarda una sola posición por id
+        posiciones = np.arange(candidatos.size)
+        marca[candidatos] = posiciones
+        frente = candidatos[marca[candidatos] == posiciones]
+        campo[frente] = pasos
+
+    return campo.reshape(filas, columnas)
+
+
+def campo_obstaculos(conf: ConfigMapa, obstaculos: Iterable[Arista]) -> np.ndarray:
+    """Distancia de cada punto de la rejilla expandida (2x) a la calle bloqueada más cercana.
+
+    Es la rejilla que usa la app para el riesgo: la intersección (f, c) es el punto
+    (2f, 2c) y cada calle bloqueada aporta su punto medio como fuente. BFS multi‑fuente por
+    frente de onda (en una rejilla sin paredes, la distancia Manhattan que mide el VP‑Tree).
+    Devuelve `int32` de forma `(2 * filas - 1, 2 * columnas - 1)`; sin obstáculos, todo -1.
+    """
+
+    alto, ancho = 2 * conf.filas - 1, 2 * conf.columnas - 1
+    n = alto * ancho
+    campo = np.full(n, -1, dtype=np.int32)
+    fuentes = [(f1 + f2) * ancho + (c1 + c2) for (f1, c1), (f2, c2) in obstaculos]
+    if not fuentes:
+        return campo.reshape(alto, ancho)
+
+    # Vecinos dentro de la rejilla por dirección (arriba, abajo, izquierda, derecha)
+    ids = np.arange(n, dtype=np.int64)
+    fila, col = ids // ancho, ids % ancho
+    validos = (fila > 0, fila < alto - 1, col > 0, col < ancho - 1)
+    desplazamiento = (-ancho, ancho, -1, 1)
+
+    marca = np.zeros(n, dtype=np.int64)
+    frente = np.unique(np.array(fuentes, dtype=np.int64))
+    campo[frente] = 0
+    pasos = 0
+    while frente.size:
+        pasos += 1
+        candidatos = np.concatenate(
+            [frente[validos[d][frente]] + desplazamiento[d] for d in range(4)]
+        )
+        candidatos = candidatos[campo[candidatos] < 0]
+        if not candidatos.size:
+            break
+        posiciones = np.arange(candidatos.size)
+        marca[candidatos] = posiciones
+        frente = candidatos[marca[candidatos] == posiciones]
+        campo[frente] = pasos
+
+    return campo.reshape(alto, ancho)
+
+
+def riesgo_intersecciones(campo: np.ndarray) -> np.ndarray:
+    """Vista `(filas, columnas)` de `campo_obstaculos` en las intersecciones: `riesgo[f, c]` en O(1)."""
+    return campo[::2, ::2]
+
+
+def riesgo_de_camino(riesgo: np.ndarray, camino: list[Coord]) -> int:
+    """Riesgo de una ruta: mínimo de `riesgo_intersecciones` a lo largo del camino (vectorizado)."""
+    puntos = np.asarray(camino, dtype=np.int64).reshape(-1, 2)
+    return int(riesgo[puntos[:, 0], puntos[:, 1]].min())
+
+
+def hay_ruta(abiertas: np.ndarray, inicio: Coord, fin: Coord) -> bool:
+    """Oráculo de alcanzabilidad (p. ej. para `hay_solucion` al generar obstáculos)."""
+    filas, columnas = abiertas.shape[:2]
+    for f, c in (inicio, fin):
+        if not (0 <= f < filas and 0 <= c < columnas):
+            return False
+    return bool(campo_distancias(abiertas, inicio, destino=fin)[fin] >= 0)
+
+
+def camino_desde_campo(abiertas: np.ndarray, campo: np.ndarray, destino: Coord) -> Optional[list[Coord]]:
+    """Reconstruye un camino más corto `origen -> destino` bajando por el campo de distancias."""
+    if campo[destino] < 0:
+        return None
+
+    camino = [destino]
+    f, c = destino
+    while campo[f, c] > 0:
+        d = campo[f, c] - 1
+        # Vecino v con campo d y calle v -> actual abierta
+        if f > 0 and campo[f - 1, c] == d and abiertas[f - 1, c, ABAJO]:
+            f -= 1
+        elif f < campo.shape[0] - 1 and campo[f + 1, c] == d and abiertas[f + 1, c, ARRIBA]:
+            f += 1
+        elif c > 0 and campo[f, c - 1] == d and abiertas[f, c - 1, DERECHA]:
+            c -= 1
+        elif c < campo.shape[1] - 1 and campo[f, c + 1] == d and abiertas[f, c + 1, IZQUIERDA]:
+            c += 1
+        else:  # pragma: no cover - el campo siempre tiene un predecesor
+            return None
+        camino.append((f, c))
+
+    camino.reverse()
+    return camino
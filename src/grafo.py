@@ -0,0 +1,716 @@
+from __future__ import annotations
+
+import heapq
+from array import array
+from typing import TYPE_CHECKING, Iterable, Optional
+
+from .a_star import Coord, EstadisticasBusqueda, ResultadoAEstrella
+from .colas import MonticuloRadix, elegir_cola
+from .grid import Arista, ConfigMapa
+
+if TYPE_CHECKING:
+    from .landmarks import TablaLandmarks
+
+INF = float("inf")
+
+# Direcciones en el mismo orden que `vecinos_4`: arriba, abajo, izquierda, derecha.
+ARRIBA, ABAJO, IZQUIERDA, DERECHA = 0, 1, 2, 3
+OPUESTA = (ABAJO, ARRIBA, DERECHA, IZQUIERDA)
+
+
+class GrafoCompilado:
+    """Grafo del mapa compilado a buffers planos (una sola vez por mapa).
+
+    - Los nodos son enteros `id = fila * columnas + columna`.
+    - Cada nodo tiene 4 ranuras (`id * 4 + direccion`) en `costo`, `tiempo` y `bloqueada`.
+    - `bloqueada[i] == 1` si la calle está bloqueada o sale del mapa.
+
+    Evita tuplas, `normalizar_arista` y callbacks por vecino en el bucle de búsqueda.
+    """
+
+    def __init__(
+        self,
+        conf: ConfigMapa,
+        obstaculos: Iterable[Arista],
+        tiempos_calles: dict[Arista, int],
+        *,
+        uniforme: bool = False,
+    ) -> None:
+        filas, columnas = int(conf.filas), int(conf.columnas)
+        n = filas * columnas
+
+        self.filas = filas
+        self.columnas = columnas
+        self.n = n
+        self.uniforme = bool(uniforme)
+        # Desplazamiento del id vecino por dirección
+        self.desplazamiento = (-columnas, columnas, -1, 1)
+
+        self.tiempo = array("l", [1]) * (4 * n)
+        self.costo = array("d", [1.0]) * (4 * n)
+        self.bloqueada = bytearray(4 * n)
+
+        for f in range(filas):
+            base_fila = f * columnas
+            for c in range(columnas):
+                base = (base_fila + c) * 4
+                if f == 0:
+                    self.bloqueada[base + ARRIBA] = 1
+                if f == filas - 1:
+                    self.bloqueada[base + ABAJO] = 1
+                if c == 0:
+                    self.bloqueada[base + IZQUIERDA] = 1
+                if c == columnas - 1:
+                    self.bloqueada[base + DERECHA] = 1
+
+        for arista, t in tiempos_calles.items():
+            ranuras = self._ranuras(arista)
+            if ranuras is None:
+                continue
+            for i in ranuras:
+                self.tiempo[i] = int(t)
+                if not self.uniforme:
+                    self.costo[i] = float(t)
+
+        for arista in obstaculos:
+            ranuras = self._ranuras(arista)
+            if ranuras is None:
+                continue
+            for i in ranuras:
+                self.bloqueada[i] = 1
+
+        self._recalcular_rango_costos()
+
+    # --- Conversión de coordenadas ---
+
+    def id_de(self, p: Coord) -> int:
+        return p[0] * self.columnas + p[1]
+
+    def coord_de(self, u: int) -> Coord:
+        f, c = divmod(u, self.columnas)
+        return (f, c)
+
+    def contiene(self, p: Coord) -> bool:
+        return 0 <= p[0] < self.filas and 0 <= p[1] < self.columnas
+
+    def direccion(self, u: int, v: int) -> int:
+        """Dirección de `u` hacia el vecino `v` (ValueError si no son vecinos)."""
+        delta = v - u
+        for d in range(4):
+            if self.desplazamiento[d] == delta and not self._fuera(u, d):
+                return d
+        raise ValueError(f"Los nodos {u} y {v} no son vecinos")
+
+    def _fuera(self, u: int, d: int) -> bool:
+        f, c = divmod(u, self.columnas)
+        if d == ARRIBA:
+            return f == 0
+        if d == ABAJO:
+            return f == self.filas - 1
+        if d == IZQUIERDA:
+            return c == 0
+        return c == self.columnas - 1
+
+    def _ranuras(self, arista: Arista) -> Optional[tuple[int, int]]:
+        a, b = arista
+        if not (self.contiene(a) and self.contiene(b)):
+            return None
+        u, v = self.id_de(a), self.id_de(b)
+        try:
+            d = self.direccion(u, v)
+        except ValueError:
+            return None
+        return u * 4 + d, v * 4 + OPUESTA[d]
+
+    # --- Consultas / mutación de calles ---
+
+    def esta_bloqueada(self, a: Coord, b: Coord) -> bool:
+        ranuras = self._ranuras((a, b))
+        return ranuras is None or bool(self.bloqueada[ranuras[0]])
+
+    def costo_arista(self, a: Coord, b: Coord) -> float:
+        ranuras = self._ranuras((a, b))
+        if ranuras is None:
+            raise ValueError(f"{a} y {b} no son intersecciones vecinas")
+        return self.costo[ranuras[0]]
+
+    def fijar_bloqueo(self, a: Coord, b: Coord, bloqueada: bool) -> None:
+        """Bloquea/desbloquea la calle (a, b) en ambos sentidos."""
+        ranuras = self._ranuras((a, b))
+        if ranuras is None:
+            raise ValueError(f"{a} y {b} no son intersecciones vecinas")
+        for i in ranuras:
+            self.bloqueada[i] = 1 if bloqueada else 0
+        if not bloqueada:
+            self._ampliar_rango_costos(self.costo[ranuras[0]])
+
+    def fijar_tiempo(self, a: Coord, b: Coord, tiempo: int) -> None:
+        """Cambia el tiempo de cruce de la calle (a, b) (y su costo si no es uniforme)."""
+        ranuras = self._ranuras((a, b))
+        if ranuras is None:
+            raise ValueError(f"{a} y {b} no son intersecciones vecinas")
+        for i in ranuras:
+            self.tiempo[i] = int(tiempo)
+            if not self.uniforme:
+                self.costo[i] = float(tiempo)
+        self._ampliar_rango_costos(self.costo[ranuras[0]])
+
+    def fijar_costo(self, a: Coord, b: Coord, costo: float) -> None:
+        """Cambia sólo el costo de la calle (a, b), no su tiempo (p. ej. para penalizarla).
+
+        Mantiene válidos `costo_min`/`costo_max`/`costos_enteros`; con un costo distinto de 1
+        el grafo deja de ser `uniforme` (sin JPS).
+        """
+        ranuras = self._ranuras((a, b))
+        if ranuras is None:
+            raise ValueError(f"{a} y {b} no son intersecciones vecinas")
+        costo = float(costo)
+        for i in ranuras:
+            self.costo[i] = costo
+        if costo != 1.0:
+            self.uniforme = False
+        self._ampliar_rango_costos(costo)
+
+    def _recalcular_rango_costos(self) -> None:
+        libres = [self.costo[i] for i in range(4 * self.n) if not self.bloqueada[i]]
+        # `costo_min` escala la heurística Manhattan (admisible si todo costo >= costo_min)
+        self.costo_min = min(libres) if libres else 1.0
+        self.costo_max = max(libres) if libres else 1.0
+        # Con costos enteros las búsquedas pueden usar colas por cubetas (ver `src/colas.py`)
+        self.costos_enteros = all(float(c).is_integer() for c in libres)
+
+    def _ampliar_rango_costos(self, costo: float) -> None:
+        # Cambios incrementales: sólo se amplía el rango, así `costo_min` sigue siendo cota inferior.
+        self.costo_min = min(self.costo_min, costo)
+        self.costo_max = max(self.costo_max, costo)
+        self.costos_enteros = self.costos_enteros and float(costo).is_integer()
+
+    def camino_a_coords(self, ids: Iterable[int]) -> list[Coord]:
+        columnas = self.columnas
+        return [divmod(u, columnas) for u in ids]  # type: ignore[misc]
+
+
+def compilar_grafo(
+    *,
+    conf: ConfigMapa,
+    obstaculos: Iterable[Arista],
+    tiempos_calles: dict[Arista, int],
+    uniforme: bool = False,
+) -> GrafoCompilado:
+    """Construye el `GrafoCompilado` de un mapa.
+
+    `uniforme=True` corresponde al criterio "distancia" (costo 1 por calle);
+    si no, el costo de cada calle es su tiempo de cruce.
+    """
+    return GrafoCompilado(conf, obstaculos, tiempos_calles, uniforme=uniforme)
+
+
+def dijkstra_grafo(grafo: GrafoCompilado, origen: int) -> array:
+    """Distancias de `origen` (id) a todos los nodos; `INF` si no es alcanzable.
+
+    Las calles son no dirigidas con el mismo costo en ambos sentidos, así que el
+    resultado también son las distancias *hacia* `origen`.
+    """
+
+    n = grafo.n
+    costo = grafo.costo
+    bloqueada = grafo.bloqueada
+    desp = grafo.desplazamiento
+
+    dist = array("d", [INF]) * n
+    dist[origen] = 0.0
+    abiertos: list[tuple[float, int]] = [(0.0, origen)]
+    heappush = heapq.heappush
+    heappop = heapq.heappop
+
+    while abiertos:
+        du, u = heappop(abiertos)
+        if du > dist[u]:
+            continue
+        base = u * 4
+        for d in range(4):
+            if bloqueada[base + d]:
+                continue
+            v = u + desp[d]
+            nd = du + costo[base + d]
+            if nd < dist[v]:
+                dist[v] = nd
+                heappush(abiertos, (nd, v))
+
+    return dist
+
+
+def _caso_trivial(
+    grafo: GrafoCompilado,
+    inicio: Coord,
+    fin: Coord,
+    nodos_bloqueados: Optional[Iterable[Coord]],
+    estadisticas: Optional[EstadisticasBusqueda],
+) -> Optional[tuple[Optional[ResultadoAEstrella]]]:
+    """Resuelve los casos sin búsqueda; devuelve `(resultado,)` o None si hay que buscar."""
+    resultado: Optional[tuple[Optional[ResultadoAEstrella]]] = None
+    if not (grafo.contiene(inicio) and grafo.contiene(fin)):
+        resultado = (None,)
+    elif inicio == fin:
+        resultado = (ResultadoAEstrella(camino=[inicio], costo_total=0.0),)
+    elif nodos_bloqueados and (inicio in nodos_bloqueados or fin in nodos_bloqueados):
+        resultado = (None,)
+    if resultado is not None and estadisticas is not None:
+        estadisticas.anotar(encontrado=resultado[0] is not None)
+    return resultado
+
+
+def _anotar(
+    estadisticas: EstadisticasBusqueda,
+    encontrado: bool,
+    expandidos: int,
+    inserciones: int,
+    pendientes: int,
+    max_abiertos: int,
+) -> None:
+    estadisticas.anotar(
+        encontrado=encontrado,
+        expandidos=expandidos,
+        inserciones=inserciones,
+        pendientes=pendientes,
+        max_abiertos=max_abiertos,
+    )
+
+
+class EspacioBusqueda:
+    """Memoria reutilizable para búsquedas sobre un grafo de `n` nodos.
+
+    En vez de limpiar `g`/`padre`/cerrados entre búsquedas, cada búsqueda toma una
+    generación nueva y sólo cuentan las entradas cuyo sello coincide: el reinicio es O(1).
+    Pensado para reusar un mismo espacio en todas las búsquedas spur de una corrida de Yen
+    (no es seguro compartirlo entre hilos).
+    """
+
+    def __init__(self, n: int) -> None:
+        self.n = n
+        self.generacion = 0
+        self.g = array("d", [INF]) * n
+        self.padre = array("l", [-1]) * n
+        self.sello_g = array("l", [0]) * n
+        self.sello_cerrado = array("l", [0]) * n
+        self.sello_bloqueo = array("l", [0]) * n
+        # Sólo JPS: memo de saltos (4 por nodo) y cerrados por dirección de llegada (5 por nodo)
+        self._memo: Optional[array] = None
+        self._sello_memo: Optional[array] = None
+        self._sello_llegada: Optional[array] = None
+
+    def nueva_generacion(self) -> int:
+        self.generacion += 1
+        return self.generacion
+
+    def bloquear_nodos(self, grafo: GrafoCompilado, nodos: Optional[Iterable[Coord]]) -> bool:
+        """Marca `nodos` como bloqueados en la generación actual; True si marcó alguno."""
+        if not nodos:
+            return False
+        gen = self.generacion
+        sello = self.sello_bloqueo
+        for p in nodos:
+            sello[grafo.id_de(p)] = gen
+        return True
+
+    def arreglos_jps(self) -> tuple[array, array, array]:
+        if self._memo is None:
+            self._memo = array("l", [-2]) * (4 * self.n)
+            self._sello_memo = array("l", [0]) * (4 * self.n)
+            self._sello_llegada = array("l", [0]) * (5 * self.n)
+        assert self._sello_memo is not None and self._sello_llegada is not None
+        return self._memo, self._sello_memo, self._sello_llegada
+
+
+def _espacio_para(grafo: GrafoCompilado, espacio: Optional[EspacioBusqueda]) -> EspacioBusqueda:
+    if espacio is None:
+        return EspacioBusqueda(grafo.n)
+    if espacio.n != grafo.n:
+        raise ValueError("El espacio de búsqueda no corresponde al tamaño del grafo")
+    return espacio
+
+
+def _aristas_dirigidas(
+    grafo: GrafoCompilado, aristas: Optional[Iterable[tuple[Coord, Coord]]]
+) -> Optional[set[tuple[int, int]]]:
+    if not aristas:
+        return None
+    return {(grafo.id_de(a), grafo.id_de(b)) for a, b in aristas}
+
+
+def _reconstruir(grafo: GrafoCompilado, padre: array, s: int, t: int) -> list[Coord]:
+    ids = [t]
+    while ids[-1] != s:
+        ids.append(padre[ids[-1]])
+    ids.reverse()
+    return grafo.camino_a_coords(ids)
+
+
+def a_estrella_grafo(
+    grafo: GrafoCompilado,
+    inicio: Coord,
+    fin: Coord,
+    *,
+    nodos_bloqueados: Optional[Iterable[Coord]] = None,
+    aristas_bloqueadas: Optional[Iterable[tuple[Coord, Coord]]] = None,
+    jps: bool = True,
+    landmarks: Optional[TablaLandmarks] = None,
+    estadisticas: Optional[EstadisticasBusqueda] = None,
+    espacio: Optional[EspacioBusqueda] = None,
+    distancias_fin: Optional[array] = None,
+    cota_costo: Optional[float] = None,
+    cola: str = "auto",
+) -> Optional[ResultadoAEstrella]:
+    """A* sobre un `GrafoCompilado` (ruta rápida de `a_estrella`).
+
+    - `nodos_bloqueados`: intersecciones prohibidas (además de las calles bloqueadas del grafo).
+    - `aristas_bloqueadas`: pares dirigidos (u, v) prohibidos sólo en esa dirección (como en Yen).
+    - Si el grafo es `uniforme` y `jps=True`, delega en `jps_grafo` (mismo costo, menos expansiones).
+    - `landmarks`: tabla ALT del mismo grafo; la heurística es el máximo entre ALT y Manhattan.
+    - `estadisticas`: acumula expansiones/inserciones/descartes (no cuesta nada si es None).
+    - `espacio`: `EspacioBusqueda` a reusar entre llamadas (evita reservar arreglos por búsqueda).
+    - `distancias_fin`: `dijkstra_grafo(grafo, id de fin)` del grafo sin bloqueos extra. Es la
+      heurística exacta (reemplaza a Manhattan/ALT y a JPS): con bloqueos extra sigue siendo
+      admisible, y los nodos con `INF` se descartan. Empates a favor del mayor `g`, así la
+      búsqueda sigue el árbol inverso mientras no esté bloqueado.
+    - `cota_costo`: sólo interesan rutas de costo <= cota; no se abren nodos con `f` mayor
+      (la heurística es admisible) y, si no queda ninguno, devuelve None sin agotar el mapa.
+    - `cola`: lista de abiertos. `"auto"` usa una cola de Dial si `grafo.costos_enteros`,
+      `costo_max <= MAX_PESO_DIAL` y no hay `distancias_fin`, y `heapq` si no; también se
+      puede forzar `"heap"`, `"dial"` o `"radix"` (montículo radix). Mismo costo; a igual `f`
+      las cubetas sacan primero el último insertado, sin el desempate por mayor `g` (que es lo
+      que hace rendir a `distancias_fin`). Las cubetas piden una heurística consistente
+      (Manhattan, ALT y `distancias_fin` lo son).
+
+    Devuelve el mismo `ResultadoAEstrella` que `a_estrella`.
+    """
+
+    if jps and grafo.uniforme and distancias_fin is None:
+        return jps_grafo(
+            grafo,
+            inicio,
+            fin,
+            nodos_bloqueados=nodos_bloqueados,
+            aristas_bloqueadas=aristas_bloqueadas,
+            estadisticas=estadisticas,
+            espacio=espacio,
+            cota_costo=cota_costo,
+        )
+
+    trivial = _caso_trivial(grafo, inicio, fin, nodos_bloqueados, estadisticas)
+    if trivial is not None:
+        return trivial[0]
+
+    s = grafo.id_de(inicio)
+    t = grafo.id_de(fin)
+    esp = _espacio_para(grafo, espacio)
+    gen = esp.nueva_generacion()
+    hay_nb = esp.bloquear_nodos(grafo, nodos_bloqueados)
+    ab = _aristas_dirigidas(grafo, aristas_bloqueadas)
+
+    columnas = grafo.columnas
+    costo = grafo.costo
+    bloqueada = grafo.bloqueada
+    desp = grafo.desplazamiento
+    escala = grafo.costo_min
+    ft, ct = divmod(t, columnas)
+
+    g = esp.g
+    padre = esp.padre
+    sello_g = esp.sello_g
+    sello_cerrado = esp.sello_cerrado
+    sello_bloqueo = esp.sello_bloqueo
+
+    alt = landmarks.cota if landmarks is not None and len(landmarks) else None
+    exacta = distancias_fin
+    cota = INF if cota_costo is None else cota_costo
+
+    g[s] = 0.0
+    sello_g[s] = gen
+    if exacta is not None:
+        h0 = exacta[s]
+    else:
+        fs, cs = divmod(s, columnas)
+        h0 = escala * (abs(fs - ft) + abs(cs - ct))
+        if alt is not None:
+            h0 = max(h0, alt(s, t))
+    if h0 == INF or h0 > cota:
+        if estadisticas is not None:
+            estadisticas.anotar(encontrado=False)
+        return None
+    # Lista de abiertos según `cola`:
+    # - heap: entradas (f, -g, id), a igual f se expande primero el más avanzado.
+    # - dial: cubetas circulares por f entero (en línea, sin llamadas por operación); con
+    #   heurística consistente, f supera al mínimo pendiente en a lo sumo 2 * costo_max.
+    # - radix: `MonticuloRadix` para rangos de costos grandes.
+    if cola == "auto" and exacta is not None:
+        # Con el árbol inverso el desempate por mayor g es lo que lo hace seguir: sólo el heap
+        modo = "heap"
+    else:
+        modo = elegir_cola(cola, grafo.costo_max if grafo.costos_enteros else None)
+    abiertos: list = [(h0, 0.0, s)] if modo == "heap" else []
+    cubetas: Optional[list[list[int]]] = None
+    radix: Optional[MonticuloRadix[int]] = None
+    if modo == "dial":
+        nc = 2 * int(grafo.costo_max) + 1
+        cubetas = [[] for _ in range(nc)]
+        actual = int(h0)
+        cubetas[actual % nc].append(s)
+    elif modo == "radix":
+        radix = MonticuloRadix()
+        radix.insertar(int(h0), s)
+    pendientes = 1
+    heappush = heapq.heappush
+    heappop = heapq.heappop
+    expandidos = 0
+    inserciones = 1
+    max_abiertos = 1
+
+    while pendientes:
+        pendientes -= 1
+        if cubetas is not None:
+            cubeta = cubetas[actual % nc]
+            while not cubeta:
+                actual += 1
+                cubeta = cubetas[actual % nc]
+            u = cubeta.pop()
+        elif radix is not None:
+            _, u = radix.extraer()
+        else:
+            _, _, u = heappop(abiertos)
+        if sello_cerrado[u] == gen:
+            continue
+        sello_cerrado[u] = gen
+        expandidos += 1
+
+        if u == t:
+            if estadisticas is not None:
+                _anotar(estadisticas, True, expandidos, inserciones, pendientes, max_abiertos)
+            return ResultadoAEstrella(camino=_reconstruir(grafo, padre, s, t), costo_total=g[t])
+
+        gu = g[u]
+        base = u * 4
+        for d in range(4):
+            if bloqueada[base + d]:
+                continue
+            v = u + desp[d]
+            if sello_cerrado[v] == gen:
+                continue
+            if hay_nb and sello_bloqueo[v] == gen:
+                continue
+            if ab is not None and (u, v) in ab:
+                continue
+            tentativo = gu + costo[base + d]
+            if sello_g[v] != gen or tentativo < g[v]:
+                if exacta is not None:
+                    h = exacta[v]
+                else:
+                    fv, cv = divmod(v, columnas)
+                    h = escala * (abs(fv - ft) + abs(cv - ct))
+                    if alt is not None:
+                        hl = alt(v, t)
+                        if hl > h:
+                            h = hl
+                if tentativo + h > cota:
+                    # Incluye h == INF (no llega a fin) y rutas que superarían la cota
+                    continue
+                sello_g[v] = gen
+                g[v] = tentativo
+                padre[v] = u
+                if cubetas is not None:
+                    cubetas[int(tentativo + h) % nc].append(v)
+                elif radix is not None:
+                    radix.insertar(int(tentativo + h), v)
+                else:
+                    heappush(abiertos, (tentativo + h, -tentativo, v))
+                pendientes += 1
+                if estadisticas is not None:
+                    inserciones += 1
+                    max_abiertos = max(max_abiertos, pendientes)
+
+    if estadisticas is not None:
+        _anotar(estadisticas, False, expandidos, inserciones, 0, max_abiertos)
+    return None
+
+
+def jps_grafo(
+    grafo: GrafoCompilado,
+    inicio: Coord,
+    fin: Coord,
+    *,
+    nodos_bloqueados: Optional[Iterable[Coord]] = None,
+    aristas_bloqueadas: Optional[Iterable[tuple[Coord, Coord]]] = None,
+    estadisticas: Optional[EstadisticasBusqueda] = None,
+    espacio: Optional[EspacioBusqueda] = None,
+    cota_costo: Optional[float] = None,
+) -> Optional[ResultadoAEstrella]:
+    """Jump Point Search 4-direcciones para grafos de costo uniforme (criterio "distancia").
+
+    Orden canónico "vertical primero": los tramos verticales sondean ambos sentidos
+    horizontales en cada paso, y un tramo horizontal sólo gira a vertical en un vecino
+    forzado, es decir, cuando el giro equivalente un paso antes está cortado por una calle
+    bloqueada. Los bloqueos son de calles (aristas), no de celdas, y también se respetan
+    `nodos_bloqueados` y `aristas_bloqueadas` (dirigidas).
+
+    Requiere `grafo.uniforme`; devuelve el mismo costo que `a_estrella_grafo` (también con
+    `cota_costo`).
+    """
+
+    if not grafo.uniforme:
+        raise ValueError("jps_grafo requiere un grafo de costo uniforme")
+    trivial = _caso_trivial(grafo, inicio, fin, nodos_bloqueados, estadisticas)
+    if trivial is not None:
+        return trivial[0]
+
+    s = grafo.id_de(inicio)
+    t = grafo.id_de(fin)
+    esp = _espacio_para(grafo, espacio)
+    gen = esp.nueva_generacion()
+    hay_nb = esp.bloquear_nodos(grafo, nodos_bloqueados)
+    sello_bloqueo = esp.sello_bloqueo
+    ab = _aristas_dirigidas(grafo, aristas_bloqueadas)
+
+    columnas = grafo.columnas
+    bloqueada = grafo.bloqueada
+    desp = grafo.desplazamiento
+    ft, ct = divmod(t, columnas)
+
+    def paso(u: int, d: int) -> int:
+        """Vecino de `u` en dirección `d`, o -1 si no se puede cruzar."""
+        if bloqueada[u * 4 + d]:
+            return -1
+        v = u + desp[d]
+        if hay_nb and sello_bloqueo[v] == gen:
+            return -1
+        if ab is not None and (u, v) in ab:
+            return -1
+        return v
+
+    # Memo de saltos por (nodo, dirección): -1 = sin punto de salto; vale sólo con el sello
+    # de esta generación. El resultado sólo depende del mapa, así cada tramo se recorre una
+    # vez por búsqueda.
+    memo, sello_memo, sello_llegada = esp.arreglos_jps()
+
+    def es_salto_h(u: int, x: int, dh: int) -> bool:
+        if x == t:
+            return True
+        for dv in (ARRIBA, ABAJO):
+            if paso(x, dv) >= 0:
+                w = paso(u, dv)
+                if w < 0 or paso(w, dh) < 0:
+                    return True
+        return False
+
+    def es_salto_v(x: int) -> bool:
+        return x == t or saltar(x, IZQUIERDA) >= 0 or saltar(x, DERECHA) >= 0
+
+    def saltar(u: int, d: int) -> int:
+        recorridos: list[int] = []
+        vertical = d in (ARRIBA, ABAJO)
+        resultado = -1
+        while True:
+            if sello_memo[u * 4 + d] == gen:
+                resultado = memo[u * 4 + d]
+                break
+            recorridos.append(u)
+            x = paso(u, d)
+            if x < 0:
+                break
+            if es_salto_v(x) if vertical else es_salto_h(u, x, d):
+                resultado = x
+                break
+            u = x
+        for r in recorridos:
+            memo[r * 4 + d] = resultado
+            sello_memo[r * 4 + d] = gen
+        return resultado
+
+    def direcciones(x: int, llegada: int) -> tuple[int, ...]:
+        if llegada < 0:
+            return (ARRIBA, ABAJO, IZQUIERDA, DERECHA)
+        if llegada in (ARRIBA, ABAJO):
+            return (llegada, IZQUIERDA, DERECHA)
+        p = x - desp[llegada]
+        forzadas = [llegada]
+        for dv in (ARRIBA, ABAJO):
+            if paso(x, dv) >= 0:
+                w = paso(p, dv)
+                if w < 0 or paso(w, llegada) < 0:
+                    forzadas.append(dv)
+        return tuple(forzadas)
+
+    g = esp.g
+    padre = esp.padre
+    sello_g = esp.sello_g
+
+    g[s] = 0.0
+    sello_g[s] = gen
+    cota = INF if cota_costo is None else cota_costo
+    fs, cs = divmod(s, columnas)
+    h0 = float(abs(fs - ft) + abs(cs - ct))
+    if h0 > cota:
+        if estadisticas is not None:
+            estadisticas.anotar(encontrado=False)
+        return None
+    # Empates en f: se prefiere el mayor g (más cerca del destino)
+    abiertos: list[tuple[float, float, int, int]] = [(h0, -0.0, s, -1)]
+    expandidos = 0
+    inserciones = 1
+    max_abiertos = 1
+
+    while abiertos:
+        _, menos_gx, x, llegada = heapq.heappop(abiertos)
+        gx = -menos_gx
+        if gx > g[x]:
+            continue
+        # Un nodo puede expandirse una vez por dirección de llegada
+        ranura = x * 5 + llegada + 1
+        if sello_llegada[ranura] == gen:
+            continue
+        sello_llegada[ranura] = gen
+        expandidos += 1
+
+        if x == t:
+            if estadisticas is not None:
+                _anotar(estadisticas, True, expandidos, inserciones, len(abiertos), max_abiertos)
+            return ResultadoAEstrella(camino=_reconstruir_saltos(grafo, padre, s, t), costo_total=g[t])
+
+        fx, cx = divmod(x, columnas)
+        for d in direcciones(x, llegada):
+            y = saltar(x, d)
+            if y < 0:
+                continue
+            fy, cy = divmod(y, columnas)
+            tentativo = gx + float(abs(fy - fx) + abs(cy - cx))
+            if tentativo + abs(fy - ft) + abs(cy - ct) > cota:
+                continue
+            if sello_g[y] != gen or tentativo <= g[y]:
+                if sello_g[y] != gen or tentativo < g[y]:
+                    sello_g[y] = gen
+                    g[y] = tentativo
+                    padre[y] = x
+                heapq.heappush(abiertos, (tentativo + abs(fy - ft) + abs(cy - ct), -tentativo, y, d))
+                if estadisticas is not None:
+                    inserciones += 1
+                    max_abiertos = max(max_abiertos, len(abiertos))
+
+    if estadisticas is not None:
+        _anotar(estadisticas, False, expandidos, inserciones, 0, max_abiertos)
+    return None
+
+
+def _reconstruir_saltos(grafo: GrafoCompilado, padre: array, s: int, t: int) -> list[Coord]:
+    saltos = [t]
+    while saltos[-1] != s:
+        saltos.append(padre[saltos[-1]])
+    saltos.reverse()
+
+    columnas = grafo.columnas
+    ids = [s]
+    for a, b in zip(saltos[:-1], saltos[1:]):
+        # Los saltos son tramos rectos: rellenar las intersecciones intermedias
+        paso = 1 if b > a else -1
+        if b // columnas != a // columnas:
+            paso *= columnas
+        ids.extend(range(a + paso, b + paso, paso))
+    return grafo.camino_a_coords(ids)
@@ -73,3 +73,109 @@ def generar_obstaculos(
     candidatas = list(todas)
     rng.shuffle(candidatas)
     return set(candidatas[: min(objetivo, len(candidatas))])
+
+
+class _UnionFind:
+    """Conjuntos disjuntos con compresión de caminos (halving) y unión por tamaño."""
+
+    def __init__(self, n: int) -> None:
+        self.padre = list(range(n))
+        self.tam = [1] * n
+
+    def raiz(self, x: int) -> int:
+        padre = self.padre
+        while padre[x] != x:
+            padre[x] = padre[padre[x]]
+            x = padre[x]
+        return x
+
+    def unir(self, a: int, b: int) -> bool:
+        """Une los conjuntos de `a` y `b`; False si ya estaban unidos."""
+        ra, rb = self.raiz(a), self.raiz(b)
+        if ra == rb:
+            return False
+        if self.tam[ra] < self.tam[rb]:
+            ra, rb = rb, ra
+        self.padre[rb] = ra
+        self.tam[ra] += self.tam[rb]
+        return True
+
+
+def generar_obstaculos_conexos(
+    *,
+    conf: ConfigMapa,
+    densidad_obstaculos: float,
+    semilla: int,
+    inicio: Coord,
+    fin: Coord,
+    conexo_total: bool = False,
+) -> set[Arista]:
+    """Como `generar_obstaculos`, pero garantiza la conectividad en una sola pasada (sin reintentos).
+
+    Las calles se barajan una vez: ese orden es el orden en que se bloquearían. Recorriéndolo
+    al revés con union-find (Kruskal) se protegen las calles que mantienen unidos `inicio` y
+    `fin` (o todo el mapa con `conexo_total=True`) bloqueándose lo más tarde posible; luego se
+    bloquean las primeras calles del orden que no estén protegidas hasta la densidad pedida.
+
+    La densidad es exacta salvo que no se pueda alcanzar sin desconectar: entonces se
+    bloquean todas las calles no protegidas.
+    """
+
+    if not (dentro_del_mapa(conf, inicio) and dentro_del_mapa(conf, fin)):
+        raise ValueError("inicio y fin deben estar dentro del mapa")
+
+    dens = max(0.0, min(1.0, float(densidad_obstaculos)))
+    columnas = conf.columnas
+    orden = calles_del_mapa(conf)
+    random.Random(int(semilla)).shuffle(orden)
+    objetivo = int(round(dens * len(orden)))
+
+    # Bosque generador máximo respecto de "bloquear más tarde"
+    conjuntos = _UnionFind(conf.filas * columnas)
+    arbol: dict[int, list[tuple[int, Arista]]] = {}
+    s, t = inicio[0] * columnas + inicio[1], fin[0] * columnas + fin[1]
+    conectados = s == t
+    for arista in reversed(orden):
+        if conectados and not conexo_total:
+            break
+        (fa, ca), (fb, cb) = arista
+        a, b = fa * columnas + ca, fb * columnas + cb
+        if conjuntos.unir(a, b):
+            arbol.setdefault(a, []).append((b, arista))
+            arbol.setdefault(b, []).append((a, arista))
+            # La conectividad sólo cambia al unir
+            conectados = conectados or conjuntos.raiz(s) == conjuntos.raiz(t)
+
+    if conexo_total:
+        protegidas = {arista for vecinos in arbol.values() for _v, arista in vecinos}
+    else:
+        protegidas = _camino_en_arbol(arbol, s, t)
+
+    obs: set[Arista] = set()
+    for arista in orden:
+        if len(obs) >= objetivo:
+            break
+        if arista not in protegidas:
+            obs.add(arista)
+    return obs
+
+
+def _camino_en_arbol(arbol: dict[int, list[tuple[int, Arista]]], s: int, t: int) -> set[Arista]:
+    """Calles del único camino `s -> t` en un bosque (vacío si s == t)."""
+    llegada: dict[int, tuple[int, Arista]] = {}
+    visitados = {s}
+    pila = [s]
+    while pila and t not in visitados:
+        u = pila.pop()
+        for v, arista in arbol.get(u, []):
+            if v not in visitados:
+                visitados.add(v)
+                llegada[v] = (u, arista)
+                pila.append(v)
+
+    camino: set[Arista] = set()
+    u = t
+    while u != s:
+        u, arista = llegada[u]
+        camino.add(arista)
+    return camino
@@ -0,0 +1,341 @@
+from __future__ import annotations
+
+import heapq
+from typing import Iterable, Optional
+
+from .a_star import Coord, ResultadoAEstrella
+from .dstar_lite import CambioCalle
+from .grafo import ABAJO, ARRIBA, DERECHA, INF, IZQUIERDA, GrafoCompilado
+
+# Tramos de borde abiertos más largos que esto reciben dos entradas (una en cada extremo)
+_LARGO_TRAMO_DOBLE = 6
+
+
+class MapaJerarquico:
+    """HPA*: abstracción por clusters de un `GrafoCompilado` grande.
+
+    - El mapa se parte en clusters de `tam_cluster x tam_cluster` intersecciones.
+    - En cada borde entre clusters vecinos, cada tramo de calles de cruce abiertas aporta una
+      entrada (dos si es largo); sus extremos son los nodos abstractos.
+    - Dentro de cada cluster se precalcula el costo entre sus nodos abstractos con los
+      tiempos y bloqueos del grafo.
+
+    La consulta conecta `inicio`/`fin` a su cluster, busca en el grafo abstracto y refina cada
+    tramo con una búsqueda dentro de un solo cluster. Como en HPA*, el resultado es
+    aproximado y sin cota garantizada: sólo se cruza entre clusters por las entradas
+    elegidas, y una ruta corta que pasa entre clusters por otra calle puede salir varias
+    veces más cara (en pruebas aleatorias, ~5 % más cara en promedio). Para el costo exacto,
+    `a_estrella_grafo`.
+    """
+
+    def __init__(self, grafo: GrafoCompilado, *, tam_cluster: int = 16) -> None:
+        if tam_cluster < 2:
+            raise ValueError("tam_cluster debe ser >= 2")
+        self.grafo = grafo
+        self.tam = int(tam_cluster)
+        self.clusters_f = -(-grafo.filas // self.tam)
+        self.clusters_c = -(-grafo.columnas // self.tam)
+
+        # (cluster_a, cluster_b) con a < b -> calles de cruce elegidas (u en a, v en b)
+        self._entradas: dict[tuple[int, int], list[tuple[int, int]]] = {}
+        # Aristas abstractas entre clusters: nodo -> [(nodo del otro lado, costo)]
+        self._cruces: dict[int, list[tuple[int, float]]] = {}
+        # Por cluster: nodo abstracto -> {otro nodo abstracto del cluster: costo}
+        self._intra: list[dict[int, dict[int, float]]] = [
+            {} for _ in range(self.clusters_f * self.clusters_c)
+        ]
+
+        for a, b in self._bordes():
+            self._calcular_entradas(a, b)
+        self._calcular_cruces()
+        for cid in range(len(self._intra)):
+            self._calcular_intra(cid)
+
+    # --- Geometría de clusters ---
+
+    def cluster_de(self, u: int) -> int:
+        f, c = divmod(u, self.grafo.columnas)
+        return (f // self.tam) * self.clusters_c + c // self.tam
+
+    def _limites(self, cid: int) -> tuple[int, int, int, int]:
+        cf, cc = divmod(cid, self.clusters_c)
+        f0, c0 = cf * self.tam, cc * self.tam
+        return f0, min(f0 + self.tam, self.grafo.filas), c0, min(c0 + self.tam, self.grafo.columnas)
+
+    def _bordes(self) -> Iterable[tuple[int, int]]:
+        for cf in range(self.clusters_f):
+            for cc in range(self.clusters_c):
+                cid = cf * self.clusters_c + cc
+                if cc + 1 < self.clusters_c:
+                    yield cid, cid + 1
+                if cf + 1 < self.clusters_f:
+                    yield cid, cid + self.clusters_c
+
+    def _vecinos_cluster(self, cid: int) -> list[int]:
+        cf, cc = divmod(cid, self.clusters_c)
+        vecinos = []
+        if cf > 0:
+            vecinos.append(cid - self.clusters_c)
+        if cf + 1 < self.clusters_f:
+            vecinos.append(cid + self.clusters_c)
+        if cc > 0:
+            vecinos.append(cid - 1)
+        if cc + 1 < self.clusters_c:
+            vecinos.append(cid + 1)
+        return vecinos
+
+    def nodos_abstractos(self, cid: int) -> set[int]:
+        return set(self._intra[cid])
+
+    @property
+    def cantidad_nodos_abstractos(self) -> int:
+        return sum(len(intra) for intra in self._intra)
+
+    # --- Preprocesamiento ---
+
+    def _calcular_entradas(self, a: int, b: int) -> bool:
+        """Recalcula las entradas del borde `a`-`b`; devuelve True si cambiaron."""
+        grafo = self.grafo
+        f0a, f1a, c0a, c1a = self._limites(a)
+        if self.clusters_c > 1 and b == a + 1:
+            # b a la derecha: cruces (f, c1a-1) -> (f, c1a)
+            d, a_lo_largo = DERECHA, ABAJO
+            lado = [f * grafo.columnas + c1a - 1 for f in range(f0a, f1a)]
+        else:
+            # b abajo: cruces (f1a-1, c) -> (f1a, c)
+            d, a_lo_largo = ABAJO, DERECHA
+            lado = [(f1a - 1) * grafo.columnas + c for c in range(c0a, c1a)]
+        paso = grafo.desplazamiento[d]
+        bloqueada = grafo.bloqueada
+
+        # Un tramo sigue mientras el cruce esté abierto y las calles a lo largo del borde
+        # (en ambos lados) también: así cada calle de cruce llega por dentro de sus clusters
+        # a la entrada elegida, y la abstracción no pierde conectividad.
+        entradas: list[tuple[int, int]] = []
+        tramo: list[int] = []
+        for u in lado:
+            if bloqueada[u * 4 + d]:
+                self._cerrar_tramo(tramo, paso, entradas)
+                tramo = []
+                continue
+            if tramo:
+                previo = tramo[-1]
+                if bloqueada[previo * 4 + a_lo_largo] or bloqueada[(previo + paso) * 4 + a_lo_largo]:
+                    self._cerrar_tramo(tramo, paso, entradas)
+                    tramo = []
+            tramo.append(u)
+        self._cerrar_tramo(tramo, paso, entradas)
+
+        cambiaron = self._entradas.get((a, b)) != entradas
+        self._entradas[(a, b)] = entradas
+        return cambiaron
+
+    @staticmethod
+    def _cerrar_tramo(tramo: list[int], paso: int, entradas: list[tuple[int, int]]) -> None:
+        if not tramo:
+            return
+        if len(tramo) > _LARGO_TRAMO_DOBLE:
+            elegidos = [tramo[0], tramo[-1]]
+        else:
+            elegidos = [tramo[len(tramo) // 2]]
+        entradas.extend((x, x + paso) for x in elegidos)
+
+    def _calcular_cruces(self) -> None:
+        grafo = self.grafo
+        cruces: dict[int, list[tuple[int, float]]] = {}
+        for entradas in self._entradas.values():
+            for u, v in entradas:
+                c = grafo.costo[u * 4 + grafo.direccion(u, v)]
+                cruces.setdefault(u, []).append((v, c))
+                cruces.setdefault(v, []).append((u, c))
+        self._cruces = cruces
+
+    def _dijkstra_en_cluster(
+        self, cid: int, origen: int, objetivos: Optional[set[int]] = None
+    ) -> tuple[dict[int, float], dict[int, int]]:
+        """Dijkstra desde `origen` sin salir del cluster (se corta al asentar todos los objetivos)."""
+        grafo = self.grafo
+        f0, f1, c0, c1 = self._limites(cid)
+        columnas = grafo.columnas
+        costo = grafo.costo
+        bloqueada = grafo.bloqueada
+        desp = grafo.desplazamiento
+        dist: dict[int, float] = {origen: 0.0}
+        padre: dict[int, int] = {}
+        abiertos: list[tuple[float, int]] = [(0.0, origen)]
+        pendientes = set(objetivos) if objetivos else None
+        while abiertos:
+            du, u = heapq.heappop(abiertos)
+            if du > dist[u]:
+                continue
+            if pendientes is not None:
+                pendientes.discard(u)
+                if not pendientes:
+                    break
+            fu, cu = divmod(u, columnas)
+            base = u * 4
+            for d, dentro in (
+                (ARRIBA, fu > f0),
+                (ABAJO, fu + 1 < f1),
+                (IZQUIERDA, cu > c0),
+                (DERECHA, cu + 1 < c1),
+            ):
+                if not dentro or bloqueada[base + d]:
+                    continue
+                v = u + desp[d]
+                nd = du + costo[base + d]
+                if nd < dist.get(v, INF):
+                    dist[v] = nd
+                    padre[v] = u
+                    heapq.heappush(abiertos, (nd, v))
+        return dist, padre
+
+    @staticmethod
+    def _camino(padre: dict[int, int], origen: int, destino: int) -> list[int]:
+        ids = [destino]
+        while ids[-1] != origen:
+            ids.append(padre[ids[-1]])
+        ids.reverse()
+        return ids
+
+    def _calcular_intra(self, cid: int) -> None:
+        nodos: set[int] = set()
+        for otro in self._vecinos_cluster(cid):
+            a, b = min(cid, otro), max(cid, otro)
+            for u, v in self._entradas.get((a, b), []):
+                nodos.add(u if a == cid else v)
+
+        # Calles no dirigidas: basta con cada par una vez
+        intra: dict[int, dict[int, float]] = {u: {} for u in nodos}
+        restantes = sorted(nodos)
+        while restantes:
+            u = restantes.pop()
+            if not restantes:
+                break
+            dist, _padre = self._dijkstra_en_cluster(cid, u, set(restantes))
+            for v in restantes:
+                if v in dist:
+                    intra[u][v] = intra[v][u] = dist[v]
+        self._intra[cid] = intra
+
+    # --- Cambios de calles ---
+
+    def aplicar_cambios(self, cambios: Iterable[CambioCalle]) -> set[int]:
+        """Aplica eventos al grafo y recalcula sólo los clusters afectados (devuelve sus ids).
+
+        Ojo: como `PlanificadorDStarLite`, modifica el grafo recibido.
+        """
+        grafo = self.grafo
+        afectados: set[int] = set()
+        for cambio in cambios:
+            a, b = cambio.arista
+            if cambio.tiempo is not None:
+                grafo.fijar_tiempo(a, b, cambio.tiempo)
+            if cambio.bloqueada is not None:
+                grafo.fijar_bloqueo(a, b, cambio.bloqueada)
+            afectados.add(self.cluster_de(grafo.id_de(a)))
+            afectados.add(self.cluster_de(grafo.id_de(b)))
+
+        # Las entradas dependen también de las calles paralelas al borde: se revisan todos los
+        # bordes de los clusters tocados, y si cambian, el vecino también se recalcula.
+        bordes = {(min(cid, otro), max(cid, otro)) for cid in afectados for otro in self._vecinos_cluster(cid)}
+        for a, b in bordes:
+            if self._calcular_entradas(a, b):
+                afectados.update((a, b))
+        self._calcular_cruces()
+        for cid in afectados:
+            self._calcular_intra(cid)
+        return afectados
+
+    # --- Consulta ---
+
+    def consultar(self, inicio: Coord, fin: Coord) -> Optional[ResultadoAEstrella]:
+        """Ruta aproximada (ver la clase: sin cota sobre el óptimo), o None si no hay."""
+        grafo = self.grafo
+        if not (grafo.contiene(inicio) and grafo.contiene(fin)):
+            return None
+        if inicio == fin:
+            return ResultadoAEstrella(camino=[inicio], costo_total=0.0)
+
+        s, t = grafo.id_de(inicio), grafo.id_de(fin)
+        cs, ct = self.cluster_de(s), self.cluster_de(t)
+
+        # Conexiones temporales de inicio/fin a los nodos abstractos de su cluster
+        dist_s, padre_s = self._dijkstra_en_cluster(cs, s)
+        dist_t, padre_t = self._dijkstra_en_cluster(ct, t)
+        salidas_s = {v: dist_s[v] for v in self._intra[cs] if v in dist_s}
+        llegadas_t = {v: dist_t[v] for v in self._intra[ct] if v in dist_t}
+        if cs == ct and t in dist_s:
+            salidas_s[t] = dist_s[t]
+
+        costo_total, ruta_abstracta = self._buscar_abstracto(s, t, salidas_s, llegadas_t)
+        if ruta_abstracta is None:
+            return None
+
+        # Refinar: cada arista abstracta es un cruce o un tramo dentro de un cluster
+        ids = [s]
+        for a, b in zip(ruta_abstracta[:-1], ruta_abstracta[1:]):
+            cid = self.cluster_de(a)
+            if cid != self.cluster_de(b):
+                tramo = [a, b]
+            elif a == s:
+                tramo = self._camino(padre_s, s, b)
+            elif b == t:
+                tramo = self._camino(padre_t, t, a)[::-1]
+            else:
+                _dist, padre = self._dijkstra_en_cluster(cid, a, {b})
+                tramo = self._camino(padre, a, b)
+            ids.extend(tramo[1:])
+
+        return ResultadoAEstrella(camino=grafo.camino_a_coords(ids), costo_total=costo_total)
+
+    def _buscar_abstracto(
+        self,
+        s: int,
+        t: int,
+        salidas_s: dict[int, float],
+        llegadas_t: dict[int, float],
+    ) -> tuple[float, Optional[list[int]]]:
+        """A* sobre el grafo abstracto más los nodos temporales `s` y `t`."""
+        columnas = self.grafo.columnas
+        escala = self.grafo.costo_min
+        ft, ct = divmod(t, columnas)
+        intra = self._intra
+        cruces = self._cruces
+        tam, clusters_c = self.tam, self.clusters_c
+        sin_aristas: dict[int, float] = {}
+
+        g: dict[int, float] = {s: 0.0}
+        padre: dict[int, int] = {}
+        abiertos: list[tuple[float, int]] = [(0.0, s)]
+        cerrados: set[int] = set()
+        while abiertos:
+            _f, u = heapq.heappop(abiertos)
+            if u in cerrados:
+                continue
+            cerrados.add(u)
+            if u == t:
+                ruta = [t]
+                while ruta[-1] != s:
+                    ruta.append(padre[ruta[-1]])
+                ruta.reverse()
+                return g[t], ruta
+
+            gu = g[u]
+            if u == s:
+                # Si inicio ya es un nodo abstracto, además conserva sus cruces
+                vecinos = list(salidas_s.items()) + cruces.get(s, [])
+            else:
+                fu, cu = divmod(u, columnas)
+                cid = (fu // tam) * clusters_c + cu // tam
+                vecinos = list(intra[cid].get(u, sin_aristas).items()) + cruces.get(u, [])
+                if u in llegadas_t:
+                    vecinos.append((t, llegadas_t[u]))
+            for v, c in vecinos:
+                tentativo = gu + c
+                if tentativo < g.get(v, INF):
+                    g[v] = tentativo
+                    padre[v] = u
+                    fv, cv = divmod(v, columnas)
+                    heapq.heappush(abiertos, (tentativo + escala * (abs(fv - ft) + abs(cv - ct)), v))
+        return INF, None
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import random
+from array import array
+from typing import Optional
+
+from .a_star import Coord
+from .grafo import INF, GrafoCompilado, dijkstra_grafo
+
+
+class TablaLandmarks:
+    """Heurística ALT (A*, Landmarks, desigualdad triangular) sobre un `GrafoCompilado`.
+
+    Guarda, por landmark `L`, un `array("d")` con `d(L, v)` para todo nodo `v`.
+    Como las calles son no dirigidas: `d(v, t) >= |d(L, t) - d(L, v)|` para todo `L`.
+
+    La cota sigue siendo admisible si luego se bloquean nodos/calles extra (Yen), pero
+    no si se desbloquean calles o bajan los tiempos: en ese caso hay que reprocesar.
+    """
+
+    def __init__(self, grafo: GrafoCompilado, landmarks: list[int], distancias: list[array]) -> None:
+        self.grafo = grafo
+        self.landmarks = landmarks
+        self.distancias = distancias
+
+    def __len__(self) -> int:
+        return len(self.landmarks)
+
+    def cota(self, u: int, t: int) -> float:
+        """Cota inferior de la distancia entre los ids `u` y `t`."""
+        mejor = 0.0
+        for dist in self.distancias:
+            du = dist[u]
+            dt = dist[t]
+            if du == INF or dt == INF:
+                if du != dt:
+                    # Uno alcanza al landmark y el otro no: están en componentes distintas
+                    return INF
+                continue
+            c = dt - du if dt > du else du - dt
+            if c > mejor:
+                mejor = c
+        return mejor
+
+    def heuristica(self, a: Coord, b: Coord) -> float:
+        """Versión por coordenadas, para `a_estrella(..., heuristica=...)`."""
+        return self.cota(self.grafo.id_de(a), self.grafo.id_de(b))
+
+
+def preprocesar_landmarks(
+    grafo: GrafoCompilado,
+    *,
+    cantidad: int = 8,
+    semilla: int = 0,
+) -> TablaLandmarks:
+    """Elige `cantidad` landmarks por "punto más lejano" y precalcula sus distancias.
+
+    - El primero es el nodo más lejano a un nodo aleatorio (reproducible por `semilla`).
+    - Cada siguiente maximiza la distancia mínima a los ya elegidos (suelen quedar en la periferia).
+
+    Cuesta `cantidad + 1` Dijkstra; se paga una vez por mapa generado.
+    """
+
+    cantidad = max(0, min(int(cantidad), grafo.n))
+    if cantidad == 0:
+        return TablaLandmarks(grafo, [], [])
+
+    rng = random.Random(int(semilla))
+    semilla_nodo = rng.randrange(grafo.n)
+    cercania = dijkstra_grafo(grafo, semilla_nodo)
+
+    landmarks: list[int] = []
+    distancias: list[array] = []
+    for _ in range(cantidad):
+        siguiente: Optional[int] = None
+        mejor = -1.0
+        for v in range(grafo.n):
+            d = cercania[v]
+            if d != INF and d > mejor:
+                mejor = d
+                siguiente = v
+        if siguiente is None or mejor <= 0.0:
+            break
+
+        dist = dijkstra_grafo(grafo, siguiente)
+        landmarks.append(siguiente)
+        distancias.append(dist)
+        if len(landmarks) == 1:
+            cercania = array("d", dist)
+        else:
+            for v in range(grafo.n):
+                if dist[v] < cercania[v]:
+                    cercania[v] = dist[v]
+
+    return TablaLandmarks(grafo, landmarks, distancias)
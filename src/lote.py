@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import heapq
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Iterable, Optional, Sequence
+
+from .a_star import Coord, ResultadoAEstrella
+from .grafo import INF, GrafoCompilado
+
+# Descriptor que reciben los procesos: (nombre costo, nombre bloqueada, filas, columnas)
+Descriptor = tuple[str, str, int, int]
+
+# Con `procesos=None`, mínimo de grupos × nodos para que valga la pena arrancar el pool
+# (un Dijkstra cuesta ~1.5 µs por nodo; el arranque, decenas de ms)
+_TRABAJO_MIN_PARALELO = 200_000
+
+
+class MapaCompartido:
+    """Copia `costo` y `bloqueada` de un `GrafoCompilado` a `multiprocessing.shared_memory`.
+
+    Los procesos del pool se enganchan a los mismos bloques (no deserializan una copia del
+    mapa cada uno). Usar como context manager: al salir se liberan los bloques.
+    """
+
+    def __init__(self, grafo: GrafoCompilado) -> None:
+        costo = grafo.costo.tobytes()
+        self._costo = shared_memory.SharedMemory(create=True, size=max(1, len(costo)))
+        self._costo.buf[: len(costo)] = costo
+        self._bloqueada = shared_memory.SharedMemory(create=True, size=max(1, len(grafo.bloqueada)))
+        self._bloqueada.buf[: len(grafo.bloqueada)] = grafo.bloqueada
+        self.descriptor: Descriptor = (self._costo.name, self._bloqueada.name, grafo.filas, grafo.columnas)
+
+    def cerrar(self) -> None:
+        for shm in (self._costo, self._bloqueada):
+            shm.close()
+            shm.unlink()
+
+    def __enter__(self) -> "MapaCompartido":
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.cerrar()
+
+
+class _VistaCompartida:
+    """Lo mínimo de `GrafoCompilado` que necesita `_resolver_grupo`, leído de memoria compartida."""
+
+    def __init__(self, descriptor: Descriptor) -> None:
+        nombre_costo, nombre_bloqueada, filas, columnas = descriptor
+        self.n = filas * columnas
+        self.desplazamiento = (-columnas, columnas, -1, 1)
+        self._shm: list[shared_memory.SharedMemory] = []
+        for nombre in (nombre_costo, nombre_bloqueada):
+            self._shm.append(shared_memory.SharedMemory(name=nombre))
+        self.costo = self._shm[0].buf[: 8 * 4 * self.n].cast("d")
+        self.bloqueada = self._shm[1].buf[: 4 * self.n]
+
+
+_vista: Optional[_VistaCompartida] = None
+
+
+def _iniciar_trabajador(descriptor: Descriptor) -> None:
+    global _vista
+    _vista = _VistaCompartida(descriptor)
+
+
+def _resolver_en_trabajador(
+    tarea: tuple[int, list[int], bool],
+) -> list[tuple[float, Optional[list[int]]]]:
+    assert _vista is not None
+    origen, destinos, caminos = tarea
+    return _resolver_grupo(_vista, origen, destinos, caminos)
+
+
+def _resolver_grupo(
+    grafo: GrafoCompilado | _VistaCompartida,
+    origen: int,
+    destinos: list[int],
+    caminos: bool,
+) -> list[tuple[float, Optional[list[int]]]]:
+    """Un solo Dijkstra desde `origen`, cortado al asentar todos los `destinos`."""
+
+    costo = grafo.costo
+    bloqueada = grafo.bloqueada
+    desp = grafo.desplazamiento
+    dist = array("d", [INF]) * grafo.n
+    padre = array("l", [-1]) * grafo.n
+    dist[origen] = 0.0
+    pendientes = set(destinos)
+    pendientes.discard(origen)
+    abiertos: list[tuple[float, int]] = [(0.0, origen)]
+    heappush = heapq.heappush
+    heappop = heapq.heappop
+
+    while abiertos and pendientes:
+        du, u = heappop(abiertos)
+        if du > dist[u]:
+            continue
+        pendientes.discard(u)
+        base = u * 4
+        for d in range(4):
+            if bloqueada[base + d]:
+                continue
+            v = u + desp[d]
+            nd = du + costo[base + d]
+            if nd < dist[v]:
+                dist[v] = nd
+                padre[v] = u
+                heappush(abiertos, (nd, v))
+
+    resultados: list[tuple[float, Optional[list[int]]]] = []
+    for t in destinos:
+        if t in pendientes or dist[t] == INF:
+            resultados.append((INF, None))
+            continue
+        ids: Optional[list[int]] = None
+        if caminos:
+            ids = [t]
+            while ids[-1] != origen:
+                ids.append(padre[ids[-1]])
+            ids.reverse()
+        resultados.append((dist[t], ids))
+    return resultados
+
+
+def _resolver_grupos(
+    grafo: GrafoCompilado,
+    grupos: list[tuple[int, list[int]]],
+    caminos: bool,
+    procesos: Optional[int],
+) -> list[list[tuple[float, Optional[list[int]]]]]:
+    if procesos is None:
+        trabajo = len(grupos) * grafo.n
+        procesos = 1 if trabajo < _TRABAJO_MIN_PARALELO else os.cpu_count() or 1
+    procesos = min(procesos, len(grupos))
+    if procesos <= 1:
+        return [_resolver_grupo(grafo, origen, destinos, caminos) for origen, destinos in grupos]
+
+    tareas = [(origen, destinos, caminos) for origen, destinos in grupos]
+    with MapaCompartido(grafo) as compartido:
+        with ProcessPoolExecutor(
+            max_workers=procesos,
+            initializer=_iniciar_trabajador,
+            initargs=(compartido.descriptor,),
+        ) as pool:
+            bloque = max(1, len(tareas) // (4 * procesos))
+            return list(pool.map(_resolver_en_trabajador, tareas, chunksize=bloque))
+
+
+def _agrupar(
+    grafo: GrafoCompilado,
+    pares: Sequence[tuple[Coord, Coord]],
+) -> tuple[bool, list[list[int]], list[tuple[int, list[int]]]]:
+    """Agrupa los pares válidos por origen (o por destino, si hay menos destinos distintos).
+
+    Devuelve `(por_destino, indices, grupos)`: `indices[k]` son las posiciones en `pares`
+    del grupo `grupos[k] = (clave, ids del otro extremo)`.
+    """
+
+    validos = [
+        i for i, (a, b) in enumerate(pares) if grafo.contiene(a) and grafo.contiene(b)
+    ]
+    por_destino = len({pares[i][1] for i in validos}) < len({pares[i][0] for i in validos})
+
+    grupos_por_clave: dict[int, list[int]] = {}
+    for i in validos:
+        clave = pares[i][1] if por_destino else pares[i][0]
+        grupos_por_clave.setdefault(grafo.id_de(clave), []).append(i)
+    grupos = [
+        (clave, [grafo.id_de(pares[i][0] if por_destino else pares[i][1]) for i in indices])
+        for clave, indices in grupos_por_clave.items()
+    ]
+    return por_destino, list(grupos_por_clave.values()), grupos
+
+
+def resolver_lote(
+    grafo: GrafoCompilado,
+    pares: Sequence[tuple[Coord, Coord]],
+    *,
+    procesos: Optional[int] = None,
+) -> list[Optional[ResultadoAEstrella]]:
+    """Resuelve muchas consultas `(inicio, fin)`; devuelve un resultado por par, en orden.
+
+    - Agrupa por origen: un Dijkstra por origen distinto sirve a todos sus destinos.
+      Como las calles son no dirigidas, si hay menos destinos distintos que orígenes se
+      agrupa por destino y se invierten los caminos.
+    - Con `procesos > 1` reparte los grupos en un `ProcessPoolExecutor` que lee el mapa de
+      memoria compartida. Por defecto (`None`) usa los núcleos disponibles sólo si el lote
+      es grande (grupos × nodos del mapa); un lote chico se resuelve en serie.
+    - Para sólo costos, `costos_lote` evita reconstruir y transferir los caminos.
+    """
+
+    por_destino, indices, grupos = _agrupar(grafo, pares)
+    salida: list[Optional[ResultadoAEstrella]] = [None] * len(pares)
+    resueltos = _resolver_grupos(grafo, grupos, True, procesos)
+    for posiciones, resultados in zip(indices, resueltos):
+        for i, (total, ids) in zip(posiciones, resultados):
+            if ids is None:
+                continue
+            camino = grafo.camino_a_coords(reversed(ids) if por_destino else ids)
+            salida[i] = ResultadoAEstrella(camino=camino, costo_total=total)
+    return salida
+
+
+def costos_lote(
+    grafo: GrafoCompilado,
+    pares: Sequence[tuple[Coord, Coord]],
+    *,
+    procesos: Optional[int] = None,
+) -> list[float]:
+    """Como `resolver_lote`, pero sólo el costo de cada par (`INF` si no hay ruta)."""
+
+    _, indices, grupos = _agrupar(grafo, pares)
+    salida = [INF] * len(pares)
+    resueltos = _resolver_grupos(grafo, grupos, False, procesos)
+    for posiciones, resultados in zip(indices, resueltos):
+        for i, (total, _ids) in zip(posiciones, resultados):
+            salida[i] = total
+    return salida
+
+
+def distancias_desde(
+    grafo: GrafoCompilado,
+    origen: Coord,
+    destinos: Iterable[Coord],
+) -> list[Optional[ResultadoAEstrella]]:
+    """Uno a muchos: un solo Dijkstra desde `origen` para todos los `destinos`."""
+    return resolver_lote(grafo, [(origen, d) for d in destinos], procesos=1)
+
+
+def matriz_distancias(
+    grafo: GrafoCompilado,
+    origenes: Sequence[Coord],
+    destinos: Sequence[Coord],
+    *,
+    procesos: Optional[int] = None,
+) -> list[list[float]]:
+    """Muchos a muchos: `matriz[i][j]` es el costo de `origenes[i]` a `destinos[j]` (`INF` si no hay ruta)."""
+    costos = costos_lote(grafo, [(a, b) for a in origenes for b in destinos], procesos=procesos)
+    m = len(destinos)
+    return [costos[i * m : (i + 1) * m] for i in range(len(origenes))]
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import heapq
+import math
+from typing import Callable, Optional
+
+from .a_star import Coord, distancias_hasta, vecinos_4
+from .yen_ksp import Ruta
+
+# Etiqueta: (distancia, tiempo, riesgo) de un camino parcial; el riesgo es la distancia
+# mínima a un obstáculo a lo largo del camino (más alto = más seguro).
+Criterios = tuple[int, int, int]
+
+
+def domina(a: Criterios, b: Criterios, epsilon: float = 0.0) -> bool:
+    """`a` domina a `b` (con tolerancia relativa `epsilon`): no peor en los tres criterios.
+
+    Distancia y tiempo se minimizan, el riesgo se maximiza. Con `epsilon=0` un empate
+    también cuenta como dominado, así cada vector de criterios se guarda una sola vez.
+    """
+    f = 1.0 + epsilon
+    return a[0] <= b[0] * f and a[1] <= b[1] * f and a[2] * f >= b[2]
+
+
+def _recortar_frente(frente: list[Criterios], max_frente: int) -> list[int]:
+    """Índices de a lo sumo `max_frente` puntos del frente, bien repartidos.
+
+    Conserva los extremos de cada criterio y agrega de a uno el punto más alejado
+    (distancia normalizada) de los ya elegidos.
+    """
+
+    if len(frente) <= max_frente:
+        return list(range(len(frente)))
+
+    rangos = []
+    for i in range(3):
+        valores = [x[i] for x in frente]
+        rangos.append((min(valores), max(max(valores) - min(valores), 1)))
+    puntos = [tuple((x[i] - rangos[i][0]) / rangos[i][1] for i in range(3)) for x in frente]
+
+    elegidos: list[int] = []
+    for i, mejor in ((0, min), (1, min), (2, max)):
+        j = mejor(range(len(frente)), key=lambda k: (frente[k][i], frente[k]))
+        if j not in elegidos:
+            elegidos.append(j)
+    elegidos = elegidos[:max_frente]
+
+    cercania = [
+        min(sum(abs(p - q) for p, q in zip(puntos[k], puntos[j])) for j in elegidos)
+        for k in range(len(frente))
+    ]
+    while len(elegidos) < max_frente:
+        j = max(range(len(frente)), key=lambda k: cercania[k])
+        elegidos.append(j)
+        for k in range(len(frente)):
+            cercania[k] = min(cercania[k], sum(abs(p - q) for p, q in zip(puntos[k], puntos[j])))
+    return elegidos
+
+
+def frente_pareto(
+    *,
+    filas: int,
+    columnas: int,
+    inicio: Coord,
+    fin: Coord,
+    es_bloqueado: Callable[[Coord], bool],
+    arista_bloqueada_base: Optional[Callable[[Coord, Coord], bool]] = None,
+    tiempo_paso: Callable[[Coord, Coord], float],
+    costo_paso: Callable[[Coord, Coord], float],
+    riesgo_punto: Callable[[Coord], int],
+    max_frente: int = 10,
+    epsilon: float = 0.0,
+    max_etiquetas: Optional[int] = None,
+) -> list[Ruta]:
+    """Rutas Pareto‑óptimas en (distancia, tiempo, riesgo), como `Ruta`.
+
+    Búsqueda multiobjetivo por etiquetas (estilo NAMOA*): cada intersección guarda sus
+    etiquetas no dominadas y se extraen en orden lexicográfico de
+    `(distancia + h_distancia, tiempo + h_tiempo, -riesgo)`. Las cotas `h_*` son exactas
+    (Dijkstra inverso desde `fin`, ver `distancias_hasta`). Una etiqueta se descarta:
+
+    - si otra etiqueta de la misma intersección la domina, o
+    - si, sumándole las cotas, ya la domina (o ε‑domina) una ruta del frente encontrado.
+
+    `riesgo_punto(p)` es la distancia de `p` al obstáculo más cercano; el riesgo de una
+    ruta es el mínimo a lo largo del camino (como `riesgo_ruta` en la app).
+
+    Para mapas grandes:
+
+    - `epsilon > 0` poda contra el frente por ε‑dominancia (p. ej. `0.05`: se descarta lo
+      que no mejora al menos un 5 % en algún criterio a las rutas ya encontradas). El frente
+      queda más chico, pero toda ruta Pareto‑óptima sigue ε‑dominada por alguna devuelta.
+      En las intersecciones la poda es exacta: la ε‑dominancia ahí se acumula por el camino.
+    - `max_etiquetas` corta la búsqueda tras extraer esa cantidad de etiquetas y devuelve
+      lo encontrado (primero salen las rutas más cortas).
+    - `max_frente` recorta el resultado a rutas bien repartidas, conservando los extremos.
+
+    Devuelve las rutas ordenadas por `costo_total` (suma de `costo_paso`).
+    """
+
+    if es_bloqueado(inicio) or es_bloqueado(fin):
+        return []
+
+    h_distancia = distancias_hasta(
+        filas, columnas, fin, es_bloqueado, lambda _u, _v: 1.0, arista_bloqueada_base
+    )
+    if inicio not in h_distancia:
+        return []
+    h_tiempo = distancias_hasta(filas, columnas, fin, es_bloqueado, tiempo_paso, arista_bloqueada_base)
+
+    # Vecinos alcanzables (los demás nunca llevan a `fin`) con su tiempo, una sola vez
+    vecinos: dict[Coord, list[tuple[Coord, int]]] = {}
+    riesgo_de: dict[Coord, int] = {}
+    for u in h_distancia:
+        lista = []
+        for v in vecinos_4(filas, columnas, u):
+            if v not in h_distancia:
+                continue
+            if arista_bloqueada_base and arista_bloqueada_base(u, v):
+                continue
+            lista.append((v, int(round(float(tiempo_paso(u, v))))))
+        vecinos[u] = lista
+        riesgo_de[u] = int(riesgo_punto(u))
+
+    # Etiquetas en arreglos paralelos; `padre` permite reconstruir el camino
+    criterios: list[Criterios] = []
+    nodo: list[Coord] = []
+    padre: list[int] = []
+    viva: list[bool] = []
+    por_nodo: dict[Coord, list[int]] = {}
+    frente: list[int] = []
+    abiertos: list[tuple[int, int, int, int]] = []
+
+    def cota(x: Criterios, v: Coord) -> Criterios:
+        return (x[0] + int(h_distancia[v]), x[1] + int(h_tiempo[v]), x[2])
+
+    # Las etiquetas salen en orden de `distancia + h_distancia` y la cota es exacta (consistente):
+    # toda ruta del frente ya tiene distancia <= la de cualquier etiqueta posterior. Dominar
+    # se reduce entonces a tiempo y riesgo: `mejor_tiempo[r]` es el menor tiempo del frente
+    # entre las rutas con riesgo >= r.
+    factor = 1.0 + epsilon
+    max_riesgo = max(riesgo_de.values())
+    mejor_tiempo = [math.inf] * (max_riesgo + 2)
+
+    def podada_por_frente(x: Criterios) -> bool:
+        # Menor riesgo entero r0 con r0 * factor >= x[2]
+        r0 = max(0, math.ceil(x[2] / factor))
+        if r0 > 0 and (r0 - 1) * factor >= x[2]:
+            r0 -= 1
+        return mejor_tiempo[min(r0, max_riesgo + 1)] <= x[1] * factor
+
+    def agregar_al_frente(i: int) -> None:
+        frente.append(i)
+        _d, t, r = criterios[i]
+        for rr in range(r, -1, -1):
+            if mejor_tiempo[rr] <= t:
+                break
+            mejor_tiempo[rr] = t
+
+    def agregar(x: Criterios, v: Coord, p: int) -> None:
+        f = cota(x, v)
+        if podada_por_frente(f):
+            return
+        etiquetas = por_nodo.setdefault(v, [])
+        for j in etiquetas:
+            if domina(criterios[j], x):
+                return
+        # La nueva etiqueta retira a las que domina (quedan en el heap, pero muertas)
+        quedan = []
+        for j in etiquetas:
+            if domina(x, criterios[j]):
+                viva[j] = False
+            else:
+                quedan.append(j)
+        i = len(criterios)
+        criterios.append(x)
+        nodo.append(v)
+        padre.append(p)
+        viva.append(True)
+        quedan.append(i)
+        por_nodo[v] = quedan
+        heapq.heappush(abiertos, (f[0], f[1], -f[2], i))
+
+    agregar((0, 0, riesgo_de[inicio]), inicio, -1)
+    extraidas = 0
+    while abiertos:
+        if max_etiquetas is not None and extraidas >= max_etiquetas:
+            break
+        _fd, _ft, _fr, i = heapq.heappop(abiertos)
+        if not viva[i]:
+            continue
+        extraidas += 1
+        u = nodo[i]
+        x = criterios[i]
+        if podada_por_frente(cota(x, u)):
+            continue
+        if u == fin:
+            agregar_al_frente(i)
+            continue
+        for v, t in vecinos[u]:
+            agregar((x[0] + 1, x[1] + t, min(x[2], riesgo_de[v])), v, i)
+
+    elegidos = _recortar_frente([criterios[i] for i in frente], max_frente)
+    candidatas: list[tuple[float, Criterios, list[Coord]]] = []
+    for j in elegidos:
+        camino: list[Coord] = []
+        i = frente[j]
+        while i != -1:
+            camino.append(nodo[i])
+            i = padre[i]
+        camino.reverse()
+        costo = sum(float(costo_paso(a, b)) for a, b in zip(camino[:-1], camino[1:]))
+        candidatas.append((costo, criterios[frente[j]], camino))
+
+    candidatas.sort(key=lambda c: (c[0], c[1][1], -c[1][2]))
+    return [
+        Ruta(ruta_id=n, camino=camino, distancia_total=d, tiempo_total=t, riesgo=r, costo_total=costo)
+        for n, (costo, (d, t, r), camino) in enumerate(candidatas, start=1)
+    ]
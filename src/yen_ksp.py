@@ -1,10 +1,23 @@
 from __future__ import annotations
 
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import Callable, Optional
+from typing import Callable, Iterator, Optional
 
-from .a_star import Coord, ResultadoAEstrella, a_estrella
+from .a_star import (
+    Coord,
+    EstadisticasBusqueda,
+    ResultadoAEstrella,
+    a_estrella,
+    a_estrella_bidireccional,
+    distancias_hasta,
+)
+from .anytime import a_estrella_anytime
 from .avl import ArbolAVL
+from .grafo import INF, EspacioBusqueda, GrafoCompilado, a_estrella_grafo, dijkstra_grafo
+from .landmarks import TablaLandmarks
 
 
 @dataclass(frozen=True)
@@ -17,7 +30,65 @@ class Ruta:
     costo_total: float
 
 
-def yen_k_mejores_rutas(
+# Tarea spur: (spur, nodos bloqueados, aristas bloqueadas, cota de costo del tramo spur)
+_TareaSpur = tuple[Coord, set[Coord], set[tuple[Coord, Coord]], Optional[float]]
+
+# Holgura para comparar sumas de costos en punto flotante
+_TOLERANCIA = 1e-9
+
+# Estado de cada proceso del pool: grafo, landmarks, árbol inverso, espacio, destino, plazo
+_contexto_spur: Optional[
+    tuple[
+        GrafoCompilado,
+        Optional[TablaLandmarks],
+        Optional[array],
+        EspacioBusqueda,
+        Coord,
+        Optional[float],
+    ]
+] = None
+
+# Marca de búsqueda no hecha porque venció el plazo
+_SIN_TIEMPO = "sin_tiempo"
+
+
+def _iniciar_proceso_spur(
+    grafo: GrafoCompilado,
+    landmarks: Optional[TablaLandmarks],
+    distancias_fin: Optional[array],
+    fin: Coord,
+    plazo: Optional[float],
+) -> None:
+    global _contexto_spur
+    _contexto_spur = (grafo, landmarks, distancias_fin, EspacioBusqueda(grafo.n), fin, plazo)
+
+
+def _buscar_spur_en_proceso(
+    tarea: _TareaSpur,
+    con_estadisticas: bool,
+) -> tuple[Optional[ResultadoAEstrella] | str, Optional[EstadisticasBusqueda]]:
+    assert _contexto_spur is not None
+    grafo, landmarks, distancias_fin, espacio, fin, plazo = _contexto_spur
+    if plazo is not None and time.perf_counter() >= plazo:
+        return _SIN_TIEMPO, None
+    spur, nodos_bloqueados, aristas_bloqueadas, cota = tarea
+    estadisticas = EstadisticasBusqueda() if con_estadisticas else None
+    resultado = a_estrella_grafo(
+        grafo,
+        spur,
+        fin,
+        nodos_bloqueados=nodos_bloqueados,
+        aristas_bloqueadas=aristas_bloqueadas,
+        landmarks=landmarks,
+        estadisticas=estadisticas,
+        espacio=espacio,
+        distancias_fin=distancias_fin,
+        cota_costo=cota,
+    )
+    return resultado, estadisticas
+
+
+def iterar_k_mejores_rutas(
     *,
     filas: int,
     columnas: int,
@@ -29,26 +100,160 @@ def yen_k_mejores_rutas(
     costo_paso: Callable[[Coord, Coord], float],
     riesgo_ruta: Callable[[list[Coord]], int],
     k: int,
-) -> list[Ruta]:
+    grafo: Optional[GrafoCompilado] = None,
+    bidireccional: bool = False,
+    landmarks: Optional[TablaLandmarks] = None,
+    estadisticas: Optional[EstadisticasBusqueda] = None,
+    plazo: Optional[float] = None,
+    procesos: int = 1,
+    arbol_inverso: bool = False,
+) -> Iterator[Ruta]:
     """Yen (K-shortest loopless paths) usando A* como subrutina.
 
-    Devuelve rutas ordenadas por `costo_total` ascendente.
+    Si se pasa `grafo` (compilado con las mismas calles bloqueadas y costos), las búsquedas
+    usan `a_estrella_grafo`; si no, se usa `a_estrella` con los callables (ruta lenta), o
+    `a_estrella_bidireccional` si `bidireccional=True`.
+
+    `landmarks` (tabla ALT precalculada para el mismo mapa y costo) acota mejor que Manhattan
+    en todas las búsquedas spur; sigue siendo admisible con los bloqueos extra de Yen.
+
+    `estadisticas`, si se pasa, acumula los contadores de todas las búsquedas A* de la
+    llamada, más cuántas búsquedas spur se hicieron y cuántas fallaron.
+
+    `plazo` (instante absoluto de `time.perf_counter()`) limita la latencia: con `grafo`, la
+    primera ruta se busca con `a_estrella_anytime` (puede ser subóptima si el plazo aprieta);
+    sin `grafo`, o si el plazo vence antes de que encuentre alguna, con una búsqueda completa
+    que no mira el plazo. Al vencer no se lanzan más búsquedas spur: se devuelven las rutas
+    aceptadas completadas con los mejores candidatos ya encontrados.
+
+    `procesos > 1` (requiere `grafo`) reparte las búsquedas spur de cada iteración en un
+    `ProcessPoolExecutor`: cada proceso recibe el grafo una sola vez y los resultados se
+    incorporan a B en el mismo orden que la corrida serial (mismas rutas). Con hilos no
+    habría ganancia: la búsqueda es Python puro y el GIL la serializa.
+
+    `arbol_inverso=True` calcula una vez un Dijkstra inverso desde `fin` (sin los bloqueos de
+    Yen) y lo usa como heurística exacta en todas las búsquedas: sigue siendo admisible con
+    los bloqueos extra, y una búsqueda spur cuyo desvío retoma el árbol termina casi sin
+    expandir. Reemplaza a cualquier otra heurística: no se combina con `landmarks` ni con
+    `bidireccional` (ValueError).
+
+    Cada búsqueda spur lleva una cota: si B ya tiene los candidatos que faltan para llegar a
+    K, el tramo spur no puede costar más que el K-ésimo menos el costo de la raíz (las
+    búsquedas sin esperanza terminan enseguida) y tampoco se guardan candidatos más caros.
+
+    Genera cada `Ruta` apenas queda aceptada (en orden de costo; `ruta_id` es su posición),
+    así se puede mostrar la primera mientras se calculan las siguientes o cortar antes.
+    Ojo: con `plazo` la primera ruta puede ser subóptima y quedar fuera de orden.
     """
 
+    if arbol_inverso and (landmarks is not None or bidireccional):
+        raise ValueError("arbol_inverso ya da la heurística exacta: no combinar con landmarks ni bidireccional")
     if k <= 0:
-        return []
+        return
 
-    r0 = a_estrella(
-        filas,
-        columnas,
-        inicio,
-        fin,
-        es_bloqueado=es_bloqueado,
-        costo_paso=costo_paso,
-        arista_bloqueada=arista_bloqueada_base,
-    )
+    # Árbol inverso desde `fin` (una sola vez por llamada)
+    distancias_fin: Optional[array] = None
+    tabla_fin: Optional[dict[Coord, float]] = None
+    if arbol_inverso:
+        if grafo is not None:
+            if grafo.contiene(fin):
+                distancias_fin = dijkstra_grafo(grafo, grafo.id_de(fin))
+        else:
+            tabla_fin = distancias_hasta(filas, columnas, fin, es_bloqueado, costo_paso, arista_bloqueada_base)
+
+    # Un solo espacio (arreglos + sellos de generación) para todas las búsquedas de la corrida
+    espacio = EspacioBusqueda(grafo.n) if grafo is not None else None
+
+    def buscar(
+        origen: Coord,
+        nodos_bloqueados: set[Coord],
+        aristas_bloqueadas: set[tuple[Coord, Coord]],
+        cota: Optional[float] = None,
+    ) -> Optional[ResultadoAEstrella]:
+        if grafo is not None:
+            return a_estrella_grafo(
+                grafo,
+                origen,
+                fin,
+                nodos_bloqueados=nodos_bloqueados,
+                aristas_bloqueadas=aristas_bloqueadas,
+                landmarks=landmarks,
+                estadisticas=estadisticas,
+                espacio=espacio,
+                distancias_fin=distancias_fin,
+                cota_costo=cota,
+            )
+
+        def arista_bloq(u: Coord, v: Coord) -> bool:
+            if arista_bloqueada_base and arista_bloqueada_base(u, v):
+                return True
+            return (u, v) in aristas_bloqueadas
+
+        def nodo_bloq(n: Coord) -> bool:
+            return n in nodos_bloqueados
+
+        if tabla_fin is not None:
+            return a_estrella(
+                filas,
+                columnas,
+                origen,
+                fin,
+                es_bloqueado=es_bloqueado,
+                costo_paso=costo_paso,
+                arista_bloqueada=arista_bloq,
+                nodo_bloqueado=nodo_bloq,
+                estadisticas=estadisticas,
+                tabla_heuristica=tabla_fin,
+                cota_costo=cota,
+            )
+
+        if bidireccional:
+            # Sin cota: el corte por f no aplica a la búsqueda desde ambos extremos
+            return a_estrella_bidireccional(
+                filas,
+                columnas,
+                origen,
+                fin,
+                es_bloqueado=es_bloqueado,
+                costo_paso=costo_paso,
+                arista_bloqueada=arista_bloq,
+                nodo_bloqueado=nodo_bloq,
+                heuristica=landmarks.heuristica if landmarks is not None else None,
+                estadisticas=estadisticas,
+            )
+        return a_estrella(
+            filas,
+            columnas,
+            origen,
+            fin,
+            es_bloqueado=es_bloqueado,
+            costo_paso=costo_paso,
+            arista_bloqueada=arista_bloq,
+            nodo_bloqueado=nodo_bloq,
+            heuristica=landmarks.heuristica if landmarks is not None else None,
+            estadisticas=estadisticas,
+            cota_costo=cota,
+        )
+
+    def vencido() -> bool:
+        return plazo is not None and time.perf_counter() >= plazo
+
+    r0: Optional[ResultadoAEstrella] = None
+    if plazo is not None and grafo is not None:
+        r0 = a_estrella_anytime(
+            grafo,
+            inicio,
+            fin,
+            plazo=plazo,
+            landmarks=landmarks,
+            estadisticas=estadisticas,
+        )
+    if r0 is None:
+        # Sin `grafo`, o el plazo venció antes de la primera solución: búsqueda completa, así
+        # siempre hay al menos una ruta si existe
+        r0 = buscar(inicio, set(), set())
     if r0 is None:
-        return []
+        return
 
     def empaquetar(ruta_id: int, camino: list[Coord], costo_total: float) -> Ruta:
         dist = max(0, len(camino) - 1)
@@ -66,74 +271,183 @@ def yen_k_mejores_rutas(
         )
 
     A: list[tuple[list[Coord], float]] = [(r0.camino, r0.costo_total)]
+    yield empaquetar(1, r0.camino, r0.costo_total)
 
-    # B como AVL: clave=costo_total, valor=camino (tuple)
-    B = ArbolAVL[float, tuple[Coord, ...]]()
+    # B como AVL: clave=costo_total, valor=camino (tuple). Sólo K - |A| candidatos pueden
+    # llegar a aceptarse: con esa capacidad, B desaloja solo los que ya no sirven.
+    B = ArbolAVL[float, tuple[Coord, ...]](capacidad=k - len(A))
     en_B: set[tuple[Coord, ...]] = set()
 
-    for i in range(k - 1):
-        camino_i, _costo_i = A[i]
+    def cota_candidatos() -> float:
+        """Costo máximo útil: con B lleno, uno más caro que su máximo nunca se aceptaría."""
+        faltan = k - len(A)
+        if faltan <= 0:
+            return -INF
+        if len(B) >= faltan:
+            return B.maximo()[0]
+        return INF
 
-        for j in range(len(camino_i) - 1):
-            spur = camino_i[j]
-            raiz = camino_i[: j + 1]
+    def costo_de(camino: list[Coord]) -> float:
+        total = 0.0
+        for a, b in zip(camino[:-1], camino[1:]):
+            total += float(costo_paso(a, b))
+        return total
 
-            # Bloquear nodos del prefijo (excepto spur) para evitar ciclos
-            nodos_bloqueados = set(raiz[:-1])
+    def tarea_spur(camino_i: list[Coord], j: int) -> _TareaSpur:
+        raiz = camino_i[: j + 1]
 
-            # Bloquear aristas que harían repetir rutas previas con mismo prefijo
-            aristas_bloqueadas: set[tuple[Coord, Coord]] = set()
-            for p_camino, _p_cost in A:
-                if len(p_camino) > j and p_camino[: j + 1] == raiz:
-                    aristas_bloqueadas.add((p_camino[j], p_camino[j + 1]))
+        # Bloquear nodos del prefijo (excepto spur) para evitar ciclos
+        nodos_bloqueados = set(raiz[:-1])
 
-            def arista_bloq(u: Coord, v: Coord) -> bool:
-                if arista_bloqueada_base and arista_bloqueada_base(u, v):
-                    return True
-                return (u, v) in aristas_bloqueadas
+        # Bloquear aristas que harían repetir rutas previas con mismo prefijo
+        aristas_bloqueadas: set[tuple[Coord, Coord]] = set()
+        for p_camino, _p_cost in A:
+            if len(p_camino) > j and p_camino[: j + 1] == raiz:
+                aristas_bloqueadas.add((p_camino[j], p_camino[j + 1]))
 
-            def nodo_bloq(n: Coord) -> bool:
-                return n in nodos_bloqueados
+        # Cota del tramo spur: lo que queda tras la raíz hasta el K-ésimo candidato
+        tope = cota_candidatos()
+        cota = None if tope == INF else tope - costo_de(raiz) + _TOLERANCIA
 
-            spur_res: Optional[ResultadoAEstrella] = a_estrella(
-                filas,
-                columnas,
-                spur,
-                fin,
-                es_bloqueado=es_bloqueado,
-                costo_paso=costo_paso,
-                arista_bloqueada=arista_bloq,
-                nodo_bloqueado=nodo_bloq,
+        return camino_i[j], nodos_bloqueados, aristas_bloqueadas, cota
+
+    # El pool se crea con la primera tanda spur: con k == 1, o si quien consume se detiene
+    # tras la primera ruta, no se lanza ningún proceso
+    paralelo = procesos > 1 and grafo is not None
+    pool: Optional[ProcessPoolExecutor] = None
+
+    def busquedas_spur(camino_i: list[Coord]) -> Iterator[tuple[int, Optional[ResultadoAEstrella]]]:
+        """Resultados spur de la iteración, en orden de `j` (serial o desde el pool)."""
+        nonlocal pool
+        if not paralelo:
+            for j in range(len(camino_i) - 1):
+                if vencido():
+                    return
+                yield j, buscar(*tarea_spur(camino_i, j))
+            return
+
+        if vencido():
+            return
+        if pool is None:
+            pool = ProcessPoolExecutor(
+                max_workers=procesos,
+                initializer=_iniciar_proceso_spur,
+                initargs=(grafo, landmarks, distancias_fin, fin, plazo),
             )
+        tareas = [tarea_spur(camino_i, j) for j in range(len(camino_i) - 1)]
+        bloque = max(1, len(tareas) // (4 * procesos))
+        resultados = pool.map(
+            _buscar_spur_en_proceso,
+            tareas,
+            [estadisticas is not None] * len(tareas),
+            chunksize=bloque,
+        )
+        for j, (spur_res, est) in enumerate(resultados):
+            if spur_res == _SIN_TIEMPO:
+                # Igual que la corrida serial: se corta en la primera búsqueda sin tiempo
+                return
+            if estadisticas is not None and est is not None:
+                estadisticas.sumar(est)
+            yield j, spur_res  # type: ignore[misc]
+
+    try:
+        for i in range(k - 1):
+            camino_i, _costo_i = A[i]
 
-            if spur_res is None:
-                continue
+            for j, spur_res in busquedas_spur(camino_i):
+                if estadisticas is not None:
+                    estadisticas.busquedas_spur += 1
+                    if spur_res is None:
+                        estadisticas.spur_fallidas += 1
 
-            nuevo_camino = raiz[:-1] + spur_res.camino
-            t = tuple(nuevo_camino)
-            if t in en_B:
-                continue
+                if spur_res is None:
+                    continue
 
-            # Costo del camino completo = costo(raíz) + costo(spur)
-            costo_raiz = 0.0
-            for a, b in zip(raiz[:-1], raiz[1:]):
-                costo_raiz += float(costo_paso(a, b))
+                raiz = camino_i[: j + 1]
+                nuevo_camino = raiz[:-1] + spur_res.camino
+                t = tuple(nuevo_camino)
+                if t in en_B:
+                    continue
 
-            costo_total = costo_raiz + float(spur_res.costo_total)
+                # Costo del camino completo = costo(raíz) + costo(spur)
+                costo_total = costo_de(raiz) + float(spur_res.costo_total)
+                if costo_total > cota_candidatos() + _TOLERANCIA:
+                    # B ya tiene suficientes candidatos más baratos
+                    continue
 
-            B.insertar(float(costo_total), t)
-            en_B.add(t)
+                # Un candidato desalojado ya no puede aceptarse: queda en `en_B` para no reinsertarlo
+                B.insertar(float(costo_total), t)
+                en_B.add(t)
 
-        if B.esta_vacio():
-            break
+            if B.esta_vacio():
+                break
 
-        costo_min, camino_min_t = B.extraer_minimo()
-        en_B.remove(camino_min_t)
-        A.append((list(camino_min_t), float(costo_min)))
+            if vencido():
+                # Sin tiempo para más spur: completar con los mejores candidatos ya encontrados
+                while len(A) < k and not B.esta_vacio():
+                    costo_min, camino_min_t = B.extraer_minimo()
+                    A.append((list(camino_min_t), float(costo_min)))
+                    yield empaquetar(len(A), *A[-1])
+                break
 
-    rutas: list[Ruta] = []
-    for idx, (camino, costo_total) in enumerate(A[:k], start=1):
-        rutas.append(empaquetar(idx, camino, costo_total))
+            costo_min, camino_min_t = B.extraer_minimo()
+            en_B.remove(camino_min_t)
+            A.append((list(camino_min_t), float(costo_min)))
+            B.fijar_capacidad(k - len(A))
+            yield empaquetar(len(A), *A[-1])
+    finally:
+        # También si quien consume deja de iterar (cierre del generador)
+        if pool is not None:
+            pool.shutdown()
+
+
+
+def yen_k_mejores_rutas(
+    *,
+    filas: int,
+    columnas: int,
+    inicio: Coord,
+    fin: Coord,
+    es_bloqueado: Callable[[Coord], bool],
+    arista_bloqueada_base: Optional[Callable[[Coord, Coord], bool]] = None,
+    tiempo_paso: Callable[[Coord, Coord], float],
+    costo_paso: Callable[[Coord, Coord], float],
+    riesgo_ruta: Callable[[list[Coord]], int],
+    k: int,
+    grafo: Optional[GrafoCompilado] = None,
+    bidireccional: bool = False,
+    landmarks: Optional[TablaLandmarks] = None,
+    estadisticas: Optional[EstadisticasBusqueda] = None,
+    plazo: Optional[float] = None,
+    procesos: int = 1,
+    arbol_inverso: bool = False,
+) -> list[Ruta]:
+    """Versión "todo junto" de `iterar_k_mejores_rutas` (mismos parámetros).
+
+    Devuelve rutas ordenadas por `costo_total` ascendente.
+    """
+
+    rutas = list(
+        iterar_k_mejores_rutas(
+            filas=filas,
+            columnas=columnas,
+            inicio=inicio,
+            fin=fin,
+            es_bloqueado=es_bloqueado,
+            arista_bloqueada_base=arista_bloqueada_base,
+            tiempo_paso=tiempo_paso,
+            costo_paso=costo_paso,
+            riesgo_ruta=riesgo_ruta,
+            k=k,
+            grafo=grafo,
+            bidireccional=bidireccional,
+            landmarks=landmarks,
+            estadisticas=estadisticas,
+            plazo=plazo,
+            procesos=procesos,
+            arbol_inverso=arbol_inverso,
+        )
+    )
 
     rutas.sort(key=lambda r: r.costo_total)
     # Reasignar IDs en orden mostrado